@@ -1,8 +1,6 @@
-from channels.db import database_sync_to_async
 from core.consumers import SCWebsocketConsumer
 
-from .serializers import IngredientSerializer, DishSerializer
-from .models import Ingredient, Dish
+from .snapshot import lunch_snapshot
 
 
 class LunchConsumer(SCWebsocketConsumer):
@@ -11,6 +9,10 @@ class LunchConsumer(SCWebsocketConsumer):
     Este consumer mantém uma conexão WebSocket com o cliente para enviar atualizações
     sobre mudanças no estoque de almoço. Ele também gerencia a autorização do usuário
     e a comunicação em grupo para atualizações em tempo real.
+
+    Ao conectar, o cliente recebe o estado completo ou, caso informe a sua última
+    versão (`?version=N`), apenas as alterações (deltas) a partir dela. A mesma
+    sincronização pode ser solicitada a qualquer momento com a mensagem `{"version": N}`.
     """
 
     async def connect(self):
@@ -20,7 +22,7 @@ class LunchConsumer(SCWebsocketConsumer):
         user = await self.get_user()
         if user and user.is_employee:
             await self.channel_layer.group_add(self.group_name, self.channel_name)
-            await self.send_stock_lunch()
+            await self.send_stock_lunch(self.get_client_version())
             return
 
         await self.close(code=4003, reason="Usuário não autorizado.")
@@ -28,27 +30,17 @@ class LunchConsumer(SCWebsocketConsumer):
     async def disconnect(self, _):
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def lunch_update(self, _):
-        await self.send_stock_lunch()
-
-    async def send_stock_lunch(self):
-        """Obtém e envia o estado atual do estoque de almoço para o cliente."""
+    async def receive_json(self, content):
+        """Reenvia as alterações a partir da versão informada pelo cliente."""
 
-        stock_lunch = await self.get_lunch()
-        await self.send_json(stock_lunch)
+        await self.send_stock_lunch(self.get_client_version(content))
 
-    @database_sync_to_async
-    def get_lunch(self):
-        """Obtem os dados dos ingredientes e dos pratos."""
+    async def lunch_update(self, event):
+        """Repassa ao cliente a alteração já codificada enviada pelo remetente da mensagem."""
 
-        ingredients = Ingredient.objects.filter(deletion_date__isnull=True).order_by(
-            "name"
-        )
-        ingredient_serializer = IngredientSerializer(ingredients, many=True)
+        await self.send(text_data=event["message"])
 
-        dish_serializer = DishSerializer(Dish.objects, many=True)
+    async def send_stock_lunch(self, version: int | None = None):
+        """Envia o estado do estoque de almoço para o cliente a partir da sua última versão."""
 
-        return {
-            "ingredients": ingredient_serializer.data,
-            "dishes": dish_serializer.data,
-        }
+        await self.send_snapshot(lunch_snapshot, version)
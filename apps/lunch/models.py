@@ -1,7 +1,29 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from core.variables import days_week
 
 
+class DishQuerySet(models.QuerySet):
+    def with_active_compositions(self):
+        """Pré-carrega as composições ativas (com seus ingredientes) ordenadas pelo nome do ingrediente.
+
+        As composições ficam disponíveis em `active_compositions`, permitindo serializar
+        os pratos da semana em uma quantidade fixa de consultas.
+        """
+
+        compositions = (
+            Composition.objects.filter(ingredient__deletion_date__isnull=True)
+            .select_related("ingredient")
+            .order_by("ingredient__name")
+        )
+
+        return self.prefetch_related(
+            models.Prefetch(
+                "composition_set", queryset=compositions, to_attr="active_compositions"
+            )
+        )
+
+
 class Dish(models.Model):
     id = models.BigAutoField(primary_key=True)
     day = models.IntegerField()
@@ -15,6 +37,8 @@ class Dish(models.Model):
     description = models.TextField(blank=True, null=True)
     path_img = models.CharField(max_length=255, blank=True, null=True)
 
+    objects = DishQuerySet.as_manager()
+
     class Meta:
         db_table = "Dish"
 
@@ -22,6 +46,45 @@ class Dish(models.Model):
         return f"Prato - {days_week[self.day]}"
 
 
+class CompositionQuerySet(models.QuerySet):
+    def active(self):
+        """Filtra as composições cujo ingrediente não foi excluído."""
+
+        return self.filter(ingredient__deletion_date__isnull=True)
+
+    def max_choice_number(self, dish: Dish) -> int:
+        """Retorna o maior número de escolha única entre as composições ativas do prato."""
+
+        return (
+            self.active()
+            .filter(dish=dish)
+            .aggregate(
+                max_choice_number=Coalesce(models.Max("config_choice_number"), 0)
+            )["max_choice_number"]
+        )
+
+    def close_choice_gap(self, dish: Dish, choice_number: int) -> int:
+        """Remove o intervalo deixado por um bloco de escolha única que ficou vazio.
+
+        Caso nenhuma composição ativa do prato possua o número `choice_number`, decrementa
+        em uma única instrução (UPDATE) os números maiores que ele. Se o bloco ainda
+        possuir composições, a numeração atual é mantida. Deve ser executado com o prato
+        bloqueado (`select_for_update`) para evitar intervalos por edições concorrentes.
+
+        Returns:
+            int: A quantidade de composições renumeradas.
+        """
+
+        dish_compositions = self.active().filter(dish=dish)
+        same_block = dish_compositions.filter(config_choice_number=choice_number)
+
+        return (
+            dish_compositions.filter(config_choice_number__gt=choice_number)
+            .filter(~models.Exists(same_block))
+            .update(config_choice_number=models.F("config_choice_number") - 1)
+        )
+
+
 class Ingredient(models.Model):
     id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=50)
@@ -32,6 +95,14 @@ class Ingredient(models.Model):
 
     class Meta:
         db_table = "Ingredient"
+        constraints = [
+            # Nome único entre os registros ativos (também utilizado nas buscas por nome).
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="unique_active_ingredient_name",
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -42,6 +113,8 @@ class Composition(models.Model):
     ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
     config_choice_number = models.IntegerField(default=0)
 
+    objects = CompositionQuerySet.as_manager()
+
     class Meta:
         db_table = "Composition"
         unique_together = ("dish", "ingredient")
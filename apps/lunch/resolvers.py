@@ -0,0 +1,42 @@
+from utils.converter import day_to_number_converter
+from core.resolver import SCResolver
+
+from .models import Dish, Ingredient, Composition
+from .snapshot import lunch_snapshot
+
+
+def load_dish(dish_name: str) -> Dish | None:
+    day = day_to_number_converter(dish_name)
+
+    if day is None:
+        return None
+
+    return Dish.objects.filter(day=day).first()
+
+
+def load_ingredient(ingredient_name: str) -> Ingredient | None:
+    return Ingredient.objects.filter(
+        name=ingredient_name, deletion_date__isnull=True
+    ).first()
+
+
+def load_composition(dish_name: str, ingredient_name: str) -> Composition | None:
+    day = day_to_number_converter(dish_name)
+
+    if day is None:
+        return None
+
+    return (
+        Composition.objects.filter(
+            dish__day=day,
+            ingredient__name=ingredient_name,
+            ingredient__deletion_date__isnull=True,
+        )
+        .select_related("dish", "ingredient")
+        .first()
+    )
+
+
+dish_resolver = SCResolver(lunch_snapshot, load_dish)
+ingredient_resolver = SCResolver(lunch_snapshot, load_ingredient)
+composition_resolver = SCResolver(lunch_snapshot, load_composition)
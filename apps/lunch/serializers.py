@@ -46,16 +46,24 @@ class DishSerializer(SCSerializer):
 
         ingredients = {"multiple_choice": []}
 
-        # Obtém as composições do prato que não foram deletadas.
-        compositions = (
-            Composition.objects.filter(dish=obj, ingredient__deletion_date__isnull=True)
-            .order_by("ingredient__name")
-            .all()
-        )
-
-        for composition in compositions:
+        # Utiliza as composições pré-carregadas por `Dish.objects.with_active_compositions`, quando disponíveis.
+        compositions = getattr(obj, "active_compositions", None)
+        if compositions is None:
+            # Obtém as composições do prato que não foram deletadas.
+            compositions = (
+                Composition.objects.filter(
+                    dish=obj, ingredient__deletion_date__isnull=True
+                )
+                .select_related("ingredient")
+                .order_by("ingredient__name")
+            )
+
+        serialized_ingredients = IngredientSerializer(
+            [composition.ingredient for composition in compositions], many=True
+        ).data
+
+        for composition, ingredient in zip(compositions, serialized_ingredients):
             choice_number = composition.config_choice_number
-            ingredient = IngredientSerializer(composition.ingredient).data
 
             if choice_number:
                 if "single_choice" not in ingredients:
@@ -82,6 +90,11 @@ class IngredientSerializer(SCSerializer):
         fields = ["name", "additional_charge"]
         model = Ingredient
 
+        extra_kwargs = {
+            # A unicidade do nome é garantida pela restrição do banco de dados (ver `integrity_error_for_name`).
+            "name": {"validators": []},
+        }
+
     def internal_value_for_additional_charge(self, value):
         """Converte a quantidade adicional para um valor numerico ao receber do usuário."""
 
@@ -90,13 +103,15 @@ class IngredientSerializer(SCSerializer):
 
         return format_price(value, to_float=True)
 
-    def validate_name(self, value):
-        """Verifica se existe um ingrediente ativo com o mesmo nome."""
-
-        if Ingredient.objects.filter(name=value, deletion_date__isnull=True).exists():
-            raise serializers.ValidationError(f'O ingrediente "{value}" já existe.')
+    def integrity_error_for_name(self, value):
+        """Retorna o erro caso exista outro ingrediente ativo com o mesmo nome."""
 
-        return value
+        if (
+            Ingredient.objects.filter(name=value, deletion_date__isnull=True)
+            .exclude(pk=getattr(self.instance, "pk", None))
+            .exists()
+        ):
+            return f'O ingrediente "{value}" já existe.'
 
     def validate_additional_charge(self, value):
         """Verifica se a quantidade adicional do ingrediente é 0 (zero) e define o campo como NULL para armazenar no banco de dados."""
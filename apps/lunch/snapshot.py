@@ -0,0 +1,80 @@
+from core.snapshot import SCSnapshot, change
+from core.variables import days_week
+
+from .serializers import IngredientSerializer, DishSerializer
+from .models import Ingredient, Dish
+
+
+class LunchSnapshot(SCSnapshot):
+    """Estado do estoque de almoço (ingredientes e pratos) enviado aos clientes websocket."""
+
+    name = "lunch"
+    group_name = "lunch_group"
+    type_message = "lunch_update"
+
+    def build(self):
+        """Obtem os dados dos ingredientes e dos pratos."""
+
+        ingredients = Ingredient.objects.filter(deletion_date__isnull=True).order_by(
+            "name"
+        )
+        ingredient_serializer = IngredientSerializer(ingredients, many=True)
+
+        dishes = Dish.objects.with_active_compositions().order_by("day")
+        dish_serializer = DishSerializer(dishes, many=True)
+
+        return {
+            "ingredients": ingredient_serializer.data,
+            "dishes": dish_serializer.data,
+        }
+
+    def select(self, data, part):
+        """Permite obter o cardápio da semana (`week`) ou o prato de um dia (ex.: 'Segunda')."""
+
+        if part is None:
+            return data
+
+        if part == "week":
+            return data["dishes"]
+
+        for dish in data["dishes"]:
+            if dish["day_name"] == part:
+                return dish
+
+        raise KeyError(part)
+
+
+def dish_change(dish: Dish) -> dict:
+    """Cria o delta com os dados atuais de um prato, incluindo os seus ingredientes."""
+
+    # As composições são obtidas novamente, pois podem ter sido alteradas após o carregamento do prato.
+    dish = Dish.objects.with_active_compositions().get(pk=dish.pk)
+
+    return change("upsert", "dish", days_week[dish.day], DishSerializer(dish).data)
+
+
+def ingredient_changes(
+    ingredient: Ingredient, key: str | None = None, deleted=False
+) -> list[dict]:
+    """Cria os deltas de um ingrediente e dos pratos em que ele está presente."""
+
+    if deleted:
+        changes = [change("delete", "ingredient", key or ingredient.name)]
+    else:
+        data = IngredientSerializer(ingredient).data
+        changes = [change("upsert", "ingredient", key or ingredient.name, data)]
+
+    dishes = (
+        Dish.objects.with_active_compositions()
+        .filter(composition__ingredient=ingredient)
+        .order_by("day")
+    )
+
+    for dish in dishes:
+        data = DishSerializer(dish).data
+        changes.append(change("upsert", "dish", days_week[dish.day], data))
+
+    return changes
+
+
+lunch_snapshot = LunchSnapshot()
@@ -1,68 +1,55 @@
 from rest_framework.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Max
 from rest_framework import status
 
-from utils.converter import day_to_number_converter
-from utils.message import dispatch_message_websocket
 from core.authentication import SCAuthenticationHttp
-from core.view import SCView
+from core.view import SCView, EMPLOYEE, PUBLIC
 
 from .serializers import DishSerializer, IngredientSerializer, CompositionSerializer
 from .models import Dish, Ingredient, Composition
+from .snapshot import lunch_snapshot, dish_change, ingredient_changes
+from .resolvers import dish_resolver, ingredient_resolver, composition_resolver
 
 
 class LunchWeekView(SCView):
     def get(self, _):
         """Retorna os dados de todos os pratos da semana."""
 
-        serializer = DishSerializer(Dish.objects, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.snapshot_response(lunch_snapshot, "week")
 
 
 class DishView(SCView):
     permission_classes = [SCAuthenticationHttp]
-    ignore_validation_for_methods = ["get"]
+    default_access = EMPLOYEE
+    access = {"get": PUBLIC}
 
     def dispatch(self, request, *args, **kwargs):
         """Verifica se o prato existe antes de acessar a view."""
 
         dish_name = kwargs.get("dish_name")
 
-        query_dish = get_object_or_404(Dish, day=day_to_number_converter(dish_name))
+        # Os dados do prato são obtidos do cardápio pré-renderizado, sem acesso ao banco de dados.
+        if request.method == "GET":
+            kwargs["dish"] = None
+            return super().dispatch(request, *args, **kwargs)
+
+        query_dish = dish_resolver.resolve_or_404(dish_name, for_write=True)
         kwargs["dish"] = query_dish
 
         return super().dispatch(request, *args, **kwargs)
 
-    def validate_before_access(self, user, _):
-        """Verifica se o usuário tem autorização para acessar os endpoints post e patch."""
-
-        return user.is_employee
-
     def get(self, _, dish_name, dish) -> Response:
         """Retorna os dados de um prato específico."""
 
-        serializer = DishSerializer(dish)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.snapshot_response(lunch_snapshot, dish_name)
 
     def post(self, request, dish_name, dish) -> Response:
         """Cria novas composições no prato (adiciona ingredientes existentes)."""
 
         data = request.data
-        data["dish"] = dish.id
-
-        if data.get("config_choice_number", None):
-            max_choice_number = Composition.objects.filter(
-                dish=dish, ingredient__deletion_date__isnull=True
-            ).aggregate(Max("config_choice_number"))["config_choice_number__max"]
-
-            if data["config_choice_number"] > max_choice_number + 1:
-                raise ValidationError(
-                    "O número de escolha única ultrapassa o valor permitido."
-                )
 
         if "list_ingredients" not in data:
             raise ValidationError(
@@ -72,32 +59,72 @@ class DishView(SCView):
         if not isinstance(data["list_ingredients"], list):
             raise ValidationError("Não foi possível identificar os ingredientes.")
 
+        # Valida uma única vez os dados comuns a todas as composições.
+        serializer = CompositionSerializer(
+            data=data, partial=True, remove_field=["dish", "ingredient"]
+        )
+        serializer.is_valid(raise_exception=True)
+        config_choice_number = serializer.validated_data.get("config_choice_number", 0)
+
+        ingredient_names = data["list_ingredients"]
+
         with transaction.atomic():
-            for ingredient_name in data.pop("list_ingredients"):
-                ingredient = Ingredient.objects.filter(
-                    name=ingredient_name, deletion_date__isnull=True
-                ).first()
+            # Bloqueia o prato para que edições concorrentes não alterem a numeração das escolhas.
+            dish = Dish.objects.select_for_update().get(pk=dish.pk)
 
-                if not ingredient:
+            if config_choice_number:
+                max_choice_number = Composition.objects.max_choice_number(dish)
+
+                if config_choice_number > max_choice_number + 1:
                     raise ValidationError(
-                        f'Ingrediente "{ingredient_name}" não encontrado.'
+                        "O número de escolha única ultrapassa o valor permitido."
                     )
 
-                if Composition.objects.filter(
-                    dish=dish, ingredient=ingredient
-                ).exists():
-                    raise ValidationError(
+            # Obtém os ingredientes e as composições existentes em uma única consulta cada.
+            ingredients = {
+                ingredient.name: ingredient
+                for ingredient in Ingredient.objects.filter(
+                    name__in=ingredient_names, deletion_date__isnull=True
+                )
+            }
+            linked_ingredients = set(
+                Composition.objects.filter(
+                    dish=dish, ingredient__in=ingredients.values()
+                ).values_list("ingredient_id", flat=True)
+            )
+
+            errors = []
+            new_compositions = []
+
+            for ingredient_name in ingredient_names:
+                ingredient = ingredients.get(ingredient_name)
+
+                if not ingredient:
+                    errors.append(f'Ingrediente "{ingredient_name}" não encontrado.')
+                    continue
+
+                if ingredient.id in linked_ingredients:
+                    errors.append(
                         f'O ingrediente "{ingredient_name}" já está vinculado ao prato de {dish_name}.'
                     )
+                    continue
+
+                linked_ingredients.add(ingredient.id)
+                new_compositions.append(
+                    Composition(
+                        dish=dish,
+                        ingredient=ingredient,
+                        config_choice_number=config_choice_number,
+                    )
+                )
 
-                data["ingredient"] = ingredient.id
+            if errors:
+                raise ValidationError(errors)
 
-                serializer = CompositionSerializer(data=data)
-                serializer.is_valid(raise_exception=True)
-                serializer.save()
+            Composition.objects.bulk_create(new_compositions)
 
         # Notifica todos os clientes websocket sobre a adição de uma nova composição no prato.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit([dish_change(dish)])
 
         return Response(
             {"message": f'Composições adicionadas ao prato "{dish_name}" com sucesso.'},
@@ -117,7 +144,7 @@ class DishView(SCView):
         serializer.save()
 
         # Notifica todos os clientes websocket sobre a edição do prato.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit([dish_change(dish)])
 
         return Response(
             {"message": f'Prato "{dish_name}" atualizado com sucesso.'},
@@ -127,11 +154,7 @@ class DishView(SCView):
 
 class IngredientsView(SCView):
     permission_classes = [SCAuthenticationHttp]
-
-    def validate_before_access(self, user, _) -> bool:
-        """Verifica se o usuário é um funcionário para acessar qualquer endpoint."""
-
-        return user.is_employee
+    default_access = EMPLOYEE
 
     def get(self, _) -> Response:
         """Retorna os dados de todos os ingredientes."""
@@ -146,10 +169,10 @@ class IngredientsView(SCView):
 
         serializer = IngredientSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        new_ingredient = serializer.save()
 
         # Notifica todos os clientes websocket sobre a adição de um novo ingrediente ao estoque.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit(ingredient_changes(new_ingredient))
 
         return Response(
             {"message": "Ingrediente criado com sucesso."},
@@ -159,24 +182,20 @@ class IngredientsView(SCView):
 
 class IngredientView(SCView):
     permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
 
     def dispatch(self, request, *args, **kwargs):
         """Verifica se o ingrediente existe antes de acessar a view."""
 
         ingredient_name = kwargs.get("ingredient_name")
 
-        query_ingredient = get_object_or_404(
-            Ingredient, name=ingredient_name, deletion_date__isnull=True
+        query_ingredient = ingredient_resolver.resolve_or_404(
+            ingredient_name, for_write=request.method not in SAFE_METHODS
         )
         kwargs["ingredient"] = query_ingredient
 
         return super().dispatch(request, *args, **kwargs)
 
-    def validate_before_access(self, user, _) -> bool:
-        """Verifica se o usuário é um funcionário para acessar qualquer endpoint."""
-
-        return user.is_employee
-
     def get(self, _, ingredient_name, ingredient) -> Response:
         """Retorna os dados de um ingrediente específico."""
 
@@ -191,7 +210,9 @@ class IngredientView(SCView):
         serializer.save()
 
         # Notifica todos os clientes websocket sobre a edição do ingrediente.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit(
+            ingredient_changes(ingredient, ingredient_name)
+        )
 
         return Response(
             {"message": f'Ingrediente "{ingredient_name}" atualizado com sucesso.'},
@@ -205,13 +226,16 @@ class IngredientView(SCView):
         ingredient.save()
 
         # Notifica todos os clientes websocket sobre a exclusão do ingrediente.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit(
+            ingredient_changes(ingredient, ingredient_name, deleted=True)
+        )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class CompositionView(SCView):
     permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
 
     def dispatch(self, request, *args, **kwargs):
         """Verifica se a composição existe antes de acessar a view."""
@@ -219,21 +243,13 @@ class CompositionView(SCView):
         dish_name = kwargs.get("dish_name")
         ingredient_name = kwargs.get("ingredient_name")
 
-        query_composition = get_object_or_404(
-            Composition,
-            dish__day=day_to_number_converter(dish_name),
-            ingredient__name=ingredient_name,
-            ingredient__deletion_date__isnull=True,
+        query_composition = composition_resolver.resolve_or_404(
+            dish_name, ingredient_name, for_write=request.method not in SAFE_METHODS
         )
         kwargs["composition"] = query_composition
 
         return super().dispatch(request, *args, **kwargs)
 
-    def validate_before_access(self, user, _) -> bool:
-        """Verifica se o usuário é um funcionário para acessar qualquer endpoint."""
-
-        return user.is_employee
-
     def get(self, _, dish_name, ingredient_name, composition) -> Response:
         """Retorna os dados de uma composição específica (Relação entre prato e ingrediente)."""
 
@@ -254,22 +270,22 @@ class CompositionView(SCView):
                 "O campo numérico 'config_choice_number' é obrigatório para atualizar a composição."
             )
 
-        dish = composition.dish
+        with transaction.atomic():
+            # Bloqueia o prato para que edições concorrentes não alterem a numeração das escolhas.
+            dish = Dish.objects.select_for_update().get(pk=composition.dish_id)
+            composition.refresh_from_db(fields=["config_choice_number"])
 
-        max_choice_number = Composition.objects.filter(
-            dish=dish, ingredient__deletion_date__isnull=True
-        ).aggregate(Max("config_choice_number"))["config_choice_number__max"]
+            max_choice_number = Composition.objects.max_choice_number(dish)
 
-        if data["config_choice_number"] > max_choice_number + 1:
-            raise ValidationError(
-                "O número de escolha única ultrapassa o valor permitido."
-            )
+            if data["config_choice_number"] > max_choice_number + 1:
+                raise ValidationError(
+                    "O número de escolha única ultrapassa o valor permitido."
+                )
 
-        # A verificação dos blocos deve iniciar a partir da composição que está sendo modificada,
-        # pois a mesma pode deixar de existir.
-        current_choice_number = composition.config_choice_number
+            # A verificação dos blocos deve iniciar a partir da composição que está sendo modificada,
+            # pois a mesma pode deixar de existir.
+            current_choice_number = composition.config_choice_number
 
-        with transaction.atomic():
             serializer = CompositionSerializer(
                 composition,
                 data=data,
@@ -281,26 +297,10 @@ class CompositionView(SCView):
 
             if current_choice_number:
                 # Atualiza a numeração das composições do prato para manter a ordem numérica, caso necessário.
-                possible_affected_compositions = (
-                    Composition.objects.filter(
-                        dish=dish,
-                        ingredient__deletion_date__isnull=True,
-                        config_choice_number__gte=current_choice_number,
-                    )
-                    .order_by("config_choice_number")
-                    .all()
-                )
-
-                for target in possible_affected_compositions:
-                    if target.config_choice_number == current_choice_number:
-                        # Se existir uma composição com a mesma numeração, mantém a ordem atual.
-                        break
-
-                    target.config_choice_number -= 1
-                    target.save()
+                Composition.objects.close_choice_gap(dish, current_choice_number)
 
         # Notifica todos os clientes websocket sobre a edição da composição.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit([dish_change(dish)])
 
         return Response(
             {
@@ -313,33 +313,18 @@ class CompositionView(SCView):
         """Exclui uma composição (Relação entre prato e ingrediente)."""
 
         with transaction.atomic():
-            choice_number = composition.config_choice_number
-            dish = composition.dish
+            # Bloqueia o prato para que edições concorrentes não alterem a numeração das escolhas.
+            dish = Dish.objects.select_for_update().get(pk=composition.dish_id)
+            composition.refresh_from_db(fields=["config_choice_number"])
 
+            choice_number = composition.config_choice_number
             composition.delete()
 
             if choice_number:
                 # Atualiza a numeração das composições do prato para manter a ordem numérica, caso necessário.
-
-                possible_affected_compositions = (
-                    Composition.objects.filter(
-                        dish=dish,
-                        ingredient__deletion_date__isnull=True,
-                        config_choice_number__gte=choice_number,
-                    )
-                    .order_by("config_choice_number")
-                    .all()
-                )
-
-                for target in possible_affected_compositions:
-                    if target.config_choice_number == choice_number:
-                        # Se existir uma composição com a mesma numeração, mantém a ordem atual.
-                        break
-
-                    target.config_choice_number -= 1
-                    target.save()
+                Composition.objects.close_choice_gap(dish, choice_number)
 
         # Notifica todos os clientes websocket sobre a exclusão da composição.
-        dispatch_message_websocket("lunch_group", "lunch_update")
+        lunch_snapshot.publish_on_commit([dish_change(dish)])
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,41 @@
+from core.consumers import SCWebsocketConsumer
+
+from .notifications import order_feed
+
+
+class OrderConsumer(SCWebsocketConsumer):
+    """Consumer para acompanhar os pedidos em tempo real.
+
+    Os funcionários recebem os eventos de todos os pedidos (grupo da cozinha) e os demais
+    usuários apenas os eventos dos seus pedidos (grupo `user_<id>`). Os eventos são enviados
+    como registros compactos (ver `OrderFeed`), já codificados pelo remetente:
+
+        {"type": "orders", "events": [{"event": "created", "id": 10, ...}, ...]}
+    """
+
+    async def connect(self):
+        self.group_names = []
+        await self.accept()
+
+        user = await self.get_user()
+        if not user:
+            await self.close(code=4003, reason="Usuário não autorizado.")
+            return
+
+        # O grupo da cozinha já recebe os eventos de todos os pedidos, inclusive os do funcionário.
+        if user.is_employee:
+            self.group_names.append(order_feed.kitchen_group)
+        else:
+            self.group_names.append(order_feed.user_group(user.id))
+
+        for group_name in self.group_names:
+            await self.channel_layer.group_add(group_name, self.channel_name)
+
+    async def disconnect(self, _):
+        for group_name in getattr(self, "group_names", []):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    async def orders_update(self, event):
+        """Repassa ao cliente os eventos já codificados enviados pelo remetente da mensagem."""
+
+        await self.send(text_data=event["message"])
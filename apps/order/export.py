@@ -0,0 +1,194 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from django.utils.dateparse import parse_date
+from django.db.models import QuerySet
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import Iterator
+import csv
+import io
+import logging
+import time as clock
+
+from core.variables import days_week
+
+from .serializers import OrderSerializer
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+
+def filter_export_period(
+    orders: QuerySet, since: str | None = None, until: str | None = None
+) -> QuerySet:
+    """Filtra os pedidos criados entre duas datas (AAAA-MM-DD), inclusive.
+
+    Raises:
+        ValidationError: Se alguma das datas for inválida.
+    """
+
+    for name, value in (("since", since), ("until", until)):
+        if value and parse_date(value) is None:
+            raise ValidationError(f'A data "{name}" deve estar no formato AAAA-MM-DD.')
+
+    # As datas são convertidas em um intervalo, mantendo o uso dos índices por creation_date.
+    if since:
+        start = datetime.combine(parse_date(since), time.min)
+        orders = orders.filter(creation_date__gte=timezone.make_aware(start))
+
+    if until:
+        end = datetime.combine(parse_date(until), time.min) + timedelta(days=1)
+        orders = orders.filter(creation_date__lt=timezone.make_aware(end))
+
+    return orders
+
+
+class OrderExport:
+    """Exportação dos pedidos e dos seus itens em CSV (um item por linha) ou JSONL (um pedido por linha).
+
+    Os pedidos são percorridos com `iterator(chunk_size=...)`, utilizando cursores do lado
+    do servidor quando suportados pelo banco de dados, e os itens são pré-carregados a cada
+    bloco. Assim, o uso de memória é constante, independente da quantidade de pedidos.
+    """
+
+    formats = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+    csv_header = [
+        "order_id",
+        "creation_date",
+        "user",
+        "order_fulfilled",
+        "final_payment_date",
+        "order_total",
+        "type",
+        "dish_name",
+        "dish_price",
+        "item",
+        "quantity",
+        "unit_price",
+        "line_total",
+    ]
+
+    def __init__(self, orders: QuerySet, format: str = "csv", chunk_size: int = 500):
+        if format not in self.formats:
+            raise ValidationError(
+                f"O formato deve ser um dos seguintes: {', '.join(self.formats)}."
+            )
+
+        self.orders = orders
+        self.format = format
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def for_period(cls, since=None, until=None, **kwargs) -> "OrderExport":
+        orders = filter_export_period(
+            Order.objects.with_details().filter(deletion_date__isnull=True),
+            since,
+            until,
+        ).order_by("creation_date", "id")
+
+        return cls(orders, **kwargs)
+
+    @property
+    def content_type(self) -> str:
+        return self.formats[self.format]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __iter__(self) -> Iterator[str]:
+        """Gera o conteúdo da exportação em partes, uma por linha."""
+
+        start = clock.perf_counter()
+        self.rows = 0
+
+        try:
+            if self.format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+
+                yield self.write_csv(buffer, writer, self.csv_header)
+
+                for order in self.orders.iterator(chunk_size=self.chunk_size):
+                    for row in self.csv_rows(order):
+                        yield self.write_csv(buffer, writer, row)
+                        self.rows += 1
+
+            else:
+                renderer = JSONRenderer()
+
+                for order in self.orders.iterator(chunk_size=self.chunk_size):
+                    yield renderer.render(OrderSerializer(order).data).decode() + "\n"
+                    self.rows += 1
+
+        finally:
+            self.elapsed = clock.perf_counter() - start
+            logger.info(
+                "Exportação de pedidos (%s): %d linhas em %.2fs (%.0f linhas/s).",
+                self.format,
+                self.rows,
+                self.elapsed,
+                self.rows_per_second,
+            )
+
+    async def stream(self, batch_size: int = 200):
+        """Gera o conteúdo da exportação para respostas assíncronas (ASGI).
+
+        O `StreamingHttpResponse` consome iteradores síncronos por completo antes de enviá-los
+        em servidores ASGI. As partes são obtidas em lotes, na mesma thread, e enviadas à medida
+        que são geradas.
+        """
+
+        iterator = iter(self)
+        next_batch = sync_to_async(lambda: "".join(islice(iterator, batch_size)))
+
+        while batch := await next_batch():
+            yield batch
+
+    def csv_rows(self, order: Order) -> Iterator[list]:
+        common = [
+            order.id,
+            timezone.localtime(order.creation_date).isoformat(),
+            order.user.username,
+            order.order_fulfilled,
+            (
+                timezone.localtime(order.final_payment_date).isoformat()
+                if order.final_payment_date
+                else ""
+            ),
+            order.lines_total,
+        ]
+
+        for line in order.purchased_snacks.all():
+            yield common + [
+                "snack",
+                "",
+                "",
+                line.name,
+                line.quantity_product,
+                line.unit_price,
+                line.line_total,
+            ]
+
+        for line in order.purchased_compositions.all():
+            yield common + [
+                "lunch",
+                days_week[line.day],
+                line.dish_price,
+                line.ingredient_name,
+                line.quantity_ingredient or "",
+                line.additional_charge or "",
+                line.line_total,
+            ]
+
+    @staticmethod
+    def write_csv(buffer: io.StringIO, writer, row: list) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+
+        return buffer.getvalue()
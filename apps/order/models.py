@@ -1,12 +1,96 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from functools import reduce
+from operator import or_
+import datetime
 
 from apps.user.models import User
 from apps.snack.models import Snack
-from apps.lunch.models import Composition
+from apps.lunch.models import Dish, Ingredient, Composition
 
 from core.variables import days_week
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_lines_total(self):
+        """Anota `lines_total` com o valor do pedido calculado a partir dos seus itens.
+
+        Utiliza apenas os valores registrados nos itens no momento da compra, sem acessar
+        os lanches, ingredientes ou pratos. O preço do prato é contabilizado uma única vez
+        por pedido, somado às cobranças adicionais dos ingredientes.
+        """
+
+        money = models.DecimalField(max_digits=5, decimal_places=2)
+
+        snacks = (
+            BuySnack.objects.filter(order=models.OuterRef("pk"))
+            .values("order")
+            .annotate(
+                total=models.Sum(
+                    models.F("unit_price") * models.F("quantity_product"),
+                    output_field=money,
+                )
+            )
+            .values("total")
+        )
+        lunch = (
+            BuyIngredient.objects.filter(order=models.OuterRef("pk"))
+            .values("order")
+            .annotate(
+                total=models.ExpressionWrapper(
+                    models.Max("dish_price")
+                    + Coalesce(
+                        models.Sum(
+                            models.F("additional_charge")
+                            * models.F("quantity_ingredient")
+                        ),
+                        0,
+                        output_field=money,
+                    ),
+                    output_field=money,
+                )
+            )
+            .values("total")
+        )
+
+        return self.annotate(
+            lines_total=models.ExpressionWrapper(
+                Coalesce(models.Subquery(snacks), 0, output_field=money)
+                + Coalesce(models.Subquery(lunch), 0, output_field=money),
+                output_field=money,
+            )
+        )
+
+    def with_details(self):
+        """Pré-carrega os itens e as edições dos pedidos para a listagem.
+
+        Os valores dos itens (`line_total`) e do pedido (`lines_total`) são calculados no
+        banco de dados, de modo que uma página de pedidos é obtida em uma quantidade fixa
+        de consultas, independente da quantidade de pedidos e itens.
+        """
+
+        return (
+            self.with_lines_total()
+            .select_related("user")
+            .prefetch_related(
+                models.Prefetch(
+                    "purchased_snacks",
+                    queryset=BuySnack.objects.with_line_total().order_by("id"),
+                ),
+                models.Prefetch(
+                    "purchased_compositions",
+                    queryset=BuyIngredient.objects.with_line_total().order_by("id"),
+                ),
+                models.Prefetch(
+                    "editions",
+                    queryset=HistoryChangeOrder.objects.select_related("user").order_by(
+                        "datetime"
+                    ),
+                ),
+            )
+        )
+
+
 class Order(models.Model):
     id = models.BigAutoField(primary_key=True)
     total_value = models.DecimalField(max_digits=5, decimal_places=2)
@@ -20,8 +104,35 @@ class Order(models.Model):
         User, on_delete=models.CASCADE, related_name="configured_orders"
     )
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = "Order"
+        # Índices da listagem paginada por (creation_date, id), um para cada filtro suportado.
+        indexes = [
+            models.Index(
+                fields=["-creation_date", "-id"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="order_creation_idx",
+            ),
+            models.Index(
+                fields=["user", "-creation_date", "-id"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="order_user_creation_idx",
+            ),
+            models.Index(
+                fields=["order_fulfilled", "-creation_date", "-id"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="order_fulfilled_creation_idx",
+            ),
+            models.Index(
+                fields=["-creation_date", "-id"],
+                condition=models.Q(
+                    deletion_date__isnull=True, final_payment_date__isnull=True
+                ),
+                name="order_unpaid_creation_idx",
+            ),
+        ]
 
     def __str__(self):
         hour = self.creation_date.hour
@@ -46,6 +157,18 @@ class HistoryChangeOrder(models.Model):
         return f"Edição de {self.user.username} no pedido {self.order.id}"
 
 
+class BuySnackQuerySet(models.QuerySet):
+    def with_line_total(self):
+        """Anota `line_total` com o valor do item (preço unitário x quantidade)."""
+
+        return self.annotate(
+            line_total=models.ExpressionWrapper(
+                models.F("unit_price") * models.F("quantity_product"),
+                output_field=models.DecimalField(max_digits=5, decimal_places=2),
+            )
+        )
+
+
 class BuySnack(models.Model):
     snack = models.ForeignKey(Snack, on_delete=models.CASCADE, related_name="purchases")
     order = models.ForeignKey(
@@ -53,29 +176,221 @@ class BuySnack(models.Model):
     )
     quantity_product = models.IntegerField(default=1)
 
+    # Dados do item no momento da compra, mantendo o histórico do pedido.
+    name = models.CharField(max_length=50)
+    unit_price = models.DecimalField(max_digits=4, decimal_places=2)
+
+    objects = BuySnackQuerySet.as_manager()
+
     class Meta:
         db_table = "Buy_snack"
         unique_together = ("snack", "order")
 
     def __str__(self):
-        return f"Compra de {self.quantity_product} unidades de {self.snack.name} no pedido {self.order.id}"
+        return f"Compra de {self.quantity_product} unidades de {self.name} no pedido {self.order_id}"
+
+
+class BuyIngredientQuerySet(models.QuerySet):
+    def with_line_total(self):
+        """Anota `line_total` com a cobrança adicional do ingrediente (cobrança x quantidade)."""
+
+        return self.annotate(
+            line_total=Coalesce(
+                models.F("additional_charge") * models.F("quantity_ingredient"),
+                0,
+                output_field=models.DecimalField(max_digits=5, decimal_places=2),
+            )
+        )
 
 
 class BuyIngredient(models.Model):
+    # A exclusão da composição mantém a linha do pedido, que possui os dados da compra.
     composition = models.ForeignKey(
-        Composition, on_delete=models.CASCADE, related_name="purchases"
+        Composition,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="purchases",
     )
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="purchased_compositions"
     )
+    # O ingrediente comprado, mantido mesmo após a exclusão da composição (ex.: para
+    # desfazer o resumo de produção no cancelamento do pedido).
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.SET_NULL, null=True, related_name="purchases"
+    )
     quantity_ingredient = models.IntegerField(blank=True, null=True)
 
+    # Dados do prato e do ingrediente no momento da compra, mantendo o histórico do pedido.
+    day = models.IntegerField()
+    dish_price = models.DecimalField(max_digits=4, decimal_places=2)
+    ingredient_name = models.CharField(max_length=50)
+    additional_charge = models.DecimalField(
+        max_digits=3, decimal_places=2, blank=True, null=True
+    )
+
+    objects = BuyIngredientQuerySet.as_manager()
+
     class Meta:
         db_table = "Buy_composition"
         unique_together = ("composition", "order")
 
     def __str__(self):
-        day = days_week[self.composition.dish.day]
-        ingredient = self.composition.ingredient.name
+        day = days_week[self.day]
+
+        return f"Compra de {self.quantity_ingredient} unidades de {self.ingredient_name} do prato de {day}, pedido {self.order_id}"
+
+
+class ProductionQuerySet(models.QuerySet):
+    def accumulate(self, date: datetime.date, deltas: dict[tuple, dict[str, int]]):
+        """Soma os valores informados (positivos ou negativos) às linhas do resumo de um dia.
+
+        As linhas inexistentes são criadas e todas são atualizadas em uma única instrução
+        (`UPDATE ... SET campo = campo + n`), sem leituras prévias, mantendo o resumo
+        consistente entre pedidos concorrentes.
+
+        Args:
+            date (date): O dia do resumo.
+            deltas (dict[tuple, dict[str, int]]): Os valores a serem somados por linha, identificada
+                pelos valores dos campos em `key_fields` (ex.: {(dish_id,): {"portions": 1}}).
+        """
+
+        if not deltas:
+            return
+
+        key_fields = self.model.key_fields
+
+        def condition(key):
+            return models.Q(**dict(zip(key_fields, key)))
+
+        self.bulk_create(
+            [self.model(date=date, **dict(zip(key_fields, key))) for key in deltas],
+            ignore_conflicts=True,
+        )
+
+        fields = {field for values in deltas.values() for field in values}
+        updates = {
+            field: models.F(field)
+            + models.Case(
+                *(
+                    models.When(condition(key), then=models.Value(values.get(field, 0)))
+                    for key, values in deltas.items()
+                ),
+                default=models.Value(0),
+                output_field=models.IntegerField(),
+            )
+            for field in fields
+        }
+
+        self.filter(reduce(or_, map(condition, deltas)), date=date).update(**updates)
+
+
+class Production(models.Model):
+    """Resumo diário da produção, mantido incrementalmente na criação e no cancelamento dos pedidos."""
+
+    key_fields: list[str] = []
+
+    date = models.DateField()
+
+    objects = ProductionQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class ProductionDish(Production):
+    key_fields = ["dish_id"]
+
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE)
+    portions = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "Production_dish"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "dish"], name="unique_production_dish"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.portions} pratos de {days_week[self.dish.day]} em {self.date}"
+
+
+class ProductionIngredient(Production):
+    key_fields = ["dish_id", "ingredient_id"]
+
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE)
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
+    portions = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "Production_ingredient"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "dish", "ingredient"],
+                name="unique_production_ingredient",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} unidades de {self.ingredient.name} em {self.date}"
+
+
+class ProductionSnack(Production):
+    key_fields = ["snack_id"]
 
-        return f"Compra de {self.quantity_ingredient} unidades de {ingredient} do prato de {day}, pedido {self.order.id}"
+    snack = models.ForeignKey(Snack, on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "Production_snack"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "snack"], name="unique_production_snack"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} unidades de {self.snack.name} em {self.date}"
+
+
+def register_production(
+    date: datetime.date,
+    snack_lines: list[tuple[int, int]],
+    ingredient_lines: list[tuple[int, int, int | None]],
+    sign: int = 1,
+):
+    """Atualiza o resumo de produção do dia com os itens de um pedido.
+
+    Args:
+        date (date): O dia do pedido.
+        snack_lines (list[tuple[int, int]]): Os lanches do pedido (snack_id, quantidade).
+        ingredient_lines (list[tuple[int, int, int | None]]): Os ingredientes do pedido
+            (dish_id, ingredient_id, quantidade). Sem quantidade, é considerada uma unidade.
+        sign (int, optional): 1 na criação do pedido e -1 no cancelamento.
+    """
+
+    ProductionSnack.objects.accumulate(
+        date,
+        {
+            (snack_id,): {"quantity": sign * quantity}
+            for snack_id, quantity in snack_lines
+        },
+    )
+
+    # Um pedido possui no máximo um prato.
+    dishes = {dish_id for dish_id, _, _ in ingredient_lines}
+    ProductionDish.objects.accumulate(
+        date, {(dish_id,): {"portions": sign} for dish_id in dishes}
+    )
+    ProductionIngredient.objects.accumulate(
+        date,
+        {
+            (dish_id, ingredient_id): {
+                "portions": sign,
+                "quantity": sign * (quantity or 1),
+            }
+            for dish_id, ingredient_id, quantity in ingredient_lines
+        },
+    )
@@ -0,0 +1,62 @@
+from django.db import transaction
+from functools import partial
+from threading import Lock
+
+from core.snapshot import SCSnapshot
+from utils.message import dispatch_message_websocket
+
+
+class OrderFeed:
+    """Fila de eventos dos pedidos enviada aos grupos websocket da cozinha e dos clientes.
+
+    Cada evento é um registro compacto (ex.: `{"event": "fulfilled", "id": 10}`) enviado ao
+    grupo da cozinha (funcionários) e ao grupo do dono do pedido (`user_<id>`). Os eventos
+    são agendados para após a confirmação da transação e, como o envio ao grupo é agrupado
+    pelo `dispatch_message_websocket`, todos os eventos pendentes de um grupo são enviados
+    em um único quadro, codificado uma única vez para todos os clientes do grupo:
+
+        {"type": "orders", "events": [...]}
+    """
+
+    kitchen_group = "kitchen"
+    type_message = "orders_update"
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending: dict[str, list[dict]] = {}
+
+    @staticmethod
+    def user_group(user_id: int) -> str:
+        return f"user_{user_id}"
+
+    def notify(self, event: dict, user_id: int):
+        """Adiciona o evento à fila da cozinha e do dono do pedido e agenda o envio."""
+
+        for group_name in (self.kitchen_group, self.user_group(user_id)):
+            with self._lock:
+                self._pending.setdefault(group_name, []).append(event)
+
+            dispatch_message_websocket(
+                group_name,
+                self.type_message,
+                partial(self._render_pending, group_name),
+            )
+
+    def notify_on_commit(self, event: dict, user_id: int):
+        """Agenda o evento para após a confirmação da transação atual."""
+
+        transaction.on_commit(lambda: self.notify(event, user_id))
+
+    def _render_pending(self, group_name: str) -> str | None:
+        """Gera o quadro com todos os eventos do grupo ainda não enviados."""
+
+        with self._lock:
+            events = self._pending.pop(group_name, None)
+
+        if not events:
+            return None
+
+        return SCSnapshot.encode({"type": "orders", "events": events})
+
+
+order_feed = OrderFeed()
@@ -1,9 +1,24 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.utils import timezone
+from decimal import Decimal
 
 from core.serializers import SCSerializer
 from core.variables import days_week
+from utils.formatters import format_price
+from apps.snack.models import Snack
+from apps.snack.snapshot import catalog_snapshot, stock_changes
+from apps.lunch.models import Composition
+from apps.lunch.resolvers import dish_resolver
 
-from .models import Order, HistoryChangeOrder, BuySnack, BuyIngredient
+from .models import (
+    Order,
+    HistoryChangeOrder,
+    BuySnack,
+    BuyIngredient,
+    register_production,
+)
+from .notifications import order_feed
 
 
 class HistoryChangeOrderSerializer(SCSerializer):
@@ -18,8 +33,9 @@ class HistoryChangeOrderSerializer(SCSerializer):
 
 
 class BuySnackSerializer(SCSerializer):
-    name = serializers.SerializerMethodField()
-    price = serializers.SerializerMethodField()
+    price = serializers.DecimalField(
+        source="unit_price", max_digits=4, decimal_places=2, read_only=True
+    )
     total_value = serializers.SerializerMethodField()
 
     class Meta:
@@ -31,20 +47,25 @@ class BuySnackSerializer(SCSerializer):
         ]
         model = BuySnack
 
-    def get_name(self, obj):
-        return obj.snack.name
+    def get_total_value(self, obj):
+        # Utiliza o valor calculado por `BuySnack.objects.with_line_total`, quando disponível.
+        line_total = getattr(obj, "line_total", None)
+        if line_total is None:
+            line_total = obj.quantity_product * obj.unit_price
 
-    def get_price(self, obj):
-        return obj.snack.price
+        return line_total
 
-    def get_total_value(self, obj):
-        return obj.quantity_product * obj.snack.price
+    def representation_for_price(self, value):
+        """Formata o preço para o padrão brasileiro (R$ XX,XX) antes de enviar."""
+
+        return format_price(float(value))
+
+    def representation_for_total_value(self, value):
+        return format_price(float(value))
 
 
 class BuyIngredientSerializer(SCSerializer):
     dish_name = serializers.SerializerMethodField()
-    dish_price = serializers.SerializerMethodField()
-    ingredient_name = serializers.SerializerMethodField()
     ingredient_price = serializers.SerializerMethodField()
 
     class Meta:
@@ -58,42 +79,68 @@ class BuyIngredientSerializer(SCSerializer):
         model = BuyIngredient
 
     def get_dish_name(self, obj):
-        return days_week[obj.dish.day]
-
-    def get_dish_price(self, obj):
-        return obj.dish.price
-
-    def get_ingredient_name(self, obj):
-        return obj.ingredient.name
+        return days_week[obj.day]
 
     def get_ingredient_price(self, obj):
-        additional_charge = obj.ingredient.additional_charge
+        # Utiliza o valor calculado por `BuyIngredient.objects.with_line_total`, quando disponível.
+        line_total = getattr(obj, "line_total", None)
+        if line_total is not None:
+            return line_total
 
-        if obj.quantity_ingredient and additional_charge:
-            return obj.quantity_ingredient * additional_charge
+        if obj.quantity_ingredient and obj.additional_charge:
+            return obj.quantity_ingredient * obj.additional_charge
 
         return 0
 
+    def representation_for_dish_price(self, value):
+        """Formata o preço para o padrão brasileiro (R$ XX,XX) antes de enviar."""
+
+        return format_price(float(value))
+
+    def representation_for_ingredient_price(self, value):
+        return format_price(float(value))
+
 
 class OrderSerializer(SCSerializer):
-    history = HistoryChangeOrderSerializer()
-    buy_snack = BuySnackSerializer()
-    buy_lunch = BuyIngredientSerializer()
+    """Representação de leitura de um pedido, com os seus itens e edições.
+
+    Deve ser utilizado com `Order.objects.with_details`, evitando consultas por pedido.
+    """
+
+    user = serializers.SerializerMethodField()
     total_value = serializers.SerializerMethodField()
+    snacks = BuySnackSerializer(source="purchased_snacks", many=True, read_only=True)
+    lunch = BuyIngredientSerializer(
+        source="purchased_compositions", many=True, read_only=True
+    )
+    history = HistoryChangeOrderSerializer(source="editions", many=True, read_only=True)
 
     class Meta:
         fields = [
+            "id",
+            "user",
             "total_value",
             "creation_date",
+            "order_fulfilled",
             "final_payment_date",
             "description",
+            "snacks",
+            "lunch",
             "history",
         ]
         model = Order
 
+    def get_user(self, obj):
+        return obj.user.username
+
     def get_total_value(self, obj):
-        print(obj.buy_snack)
-        print(obj.buy_lunch)
+        # Utiliza o valor calculado a partir dos itens por `Order.objects.with_lines_total`, quando disponível.
+        return getattr(obj, "lines_total", obj.total_value)
+
+    def representation_for_total_value(self, value):
+        """Formata o valor para o padrão brasileiro (R$ XX,XX) antes de enviar."""
+
+        return format_price(float(value))
 
     def validate_total_value(self, value):
         if not value:
@@ -102,3 +149,301 @@ class OrderSerializer(SCSerializer):
             )
 
         return value
+
+
+class OrderUpdateSerializer(serializers.Serializer):
+    order_fulfilled = serializers.BooleanField(required=False)
+    paid = serializers.BooleanField(required=False)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Nenhuma alteração foi informada.")
+
+        return data
+
+
+class SnackLineSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=50)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class IngredientLineSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=50)
+    quantity = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+
+
+class LunchLineSerializer(serializers.Serializer):
+    dish = serializers.CharField()
+    ingredients = IngredientLineSerializer(many=True, allow_empty=False)
+
+
+class PlaceOrderSerializer(serializers.Serializer):
+    """Valida e registra um novo pedido com os seus itens (lanches e/ou almoço).
+
+    Os itens são resolvidos em consultas agrupadas (uma para os lanches e uma para as
+    composições do prato) e o valor total é calculado no servidor. O pedido e os seus
+    itens são criados em uma única transação, com `bulk_create` para os itens, de modo
+    que a quantidade de consultas não depende da quantidade de itens do pedido.
+    """
+
+    snacks = SnackLineSerializer(many=True, required=False)
+    lunch = LunchLineSerializer(required=False)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+
+    def validate(self, data):
+        if not data.get("snacks") and not data.get("lunch"):
+            raise serializers.ValidationError("O pedido deve possuir ao menos um item.")
+
+        data["snack_lines"] = self.resolve_snacks(data.get("snacks", []))
+        data["ingredient_lines"] = self.resolve_lunch(data.get("lunch"))
+        data["total_value"] = self.calculate_total_value(
+            data["snack_lines"], data["ingredient_lines"]
+        )
+
+        return data
+
+    def resolve_snacks(self, lines: list[dict]) -> list[tuple[Snack, int]]:
+        """Obtém os lanches do pedido em uma única consulta, somando os itens repetidos."""
+
+        quantities: dict[str, int] = {}
+        for line in lines:
+            quantities[line["name"]] = (
+                quantities.get(line["name"], 0) + line["quantity"]
+            )
+
+        if not quantities:
+            return []
+
+        snacks = {
+            snack.name: snack
+            for snack in Snack.objects.filter(
+                name__in=quantities,
+                deletion_date__isnull=True,
+                category__deletion_date__isnull=True,
+            )
+        }
+
+        missing = [name for name in quantities if name not in snacks]
+        if missing:
+            raise serializers.ValidationError(
+                {"snacks": [f'O item "{name}" não foi encontrado.' for name in missing]}
+            )
+
+        return [(snacks[name], quantity) for name, quantity in quantities.items()]
+
+    def resolve_lunch(self, lunch: dict | None) -> list[tuple[Composition, int | None]]:
+        """Obtém as composições escolhidas do prato em uma única consulta."""
+
+        if not lunch:
+            return []
+
+        dish_name = lunch["dish"]
+        # O prato é obtido do banco de dados, pois o seu preço é registrado no pedido.
+        dish = dish_resolver.resolve(dish_name, for_write=True)
+
+        if dish is None:
+            raise serializers.ValidationError(
+                {"lunch": f'O prato "{dish_name}" não foi encontrado.'}
+            )
+
+        self.validate_dish_deadline(dish, dish_name)
+
+        quantities: dict[str, int | None] = {}
+        for line in lunch["ingredients"]:
+            if line["name"] in quantities:
+                raise serializers.ValidationError(
+                    {
+                        "lunch": f'O ingrediente "{line["name"]}" foi informado mais de uma vez.'
+                    }
+                )
+
+            quantities[line["name"]] = line.get("quantity")
+
+        compositions = {
+            composition.ingredient.name: composition
+            for composition in Composition.objects.active()
+            .filter(dish=dish, ingredient__name__in=quantities)
+            .select_related("ingredient")
+        }
+
+        missing = [name for name in quantities if name not in compositions]
+        if missing:
+            raise serializers.ValidationError(
+                {
+                    "lunch": [
+                        f'O ingrediente "{name}" não faz parte do prato "{dish_name}".'
+                        for name in missing
+                    ]
+                }
+            )
+
+        # Apenas um ingrediente pode ser escolhido em cada bloco de escolha única.
+        choices: dict[int, str] = {}
+        for name, composition in compositions.items():
+            number = composition.config_choice_number
+
+            if number and number in choices:
+                raise serializers.ValidationError(
+                    {
+                        "lunch": f'Os ingredientes "{choices[number]}" e "{name}" são de escolha única.'
+                    }
+                )
+
+            choices[number] = name
+
+        for composition in compositions.values():
+            composition.dish = dish
+
+        return [(compositions[name], quantity) for name, quantity in quantities.items()]
+
+    def validate_dish_deadline(self, dish, dish_name: str):
+        """Verifica se o prato pode ser pedido no horário atual."""
+
+        now = timezone.localtime()
+
+        if dish.day != now.isoweekday():
+            raise serializers.ValidationError(
+                {"lunch": f'O prato "{dish_name}" só pode ser pedido no próprio dia.'}
+            )
+
+        if dish.initial_deadline and now.time() < dish.initial_deadline:
+            raise serializers.ValidationError(
+                {"lunch": f'Os pedidos do prato "{dish_name}" ainda não foram abertos.'}
+            )
+
+        if dish.deadline and now.time() > dish.deadline:
+            raise serializers.ValidationError(
+                {"lunch": f'O prazo para pedir o prato "{dish_name}" foi encerrado.'}
+            )
+
+    def calculate_total_value(self, snack_lines, ingredient_lines) -> Decimal:
+        total_value = sum(
+            (snack.price * quantity for snack, quantity in snack_lines), Decimal(0)
+        )
+
+        if ingredient_lines:
+            total_value += ingredient_lines[0][0].dish.price
+
+        for composition, quantity in ingredient_lines:
+            additional_charge = composition.ingredient.additional_charge
+
+            if quantity and additional_charge:
+                total_value += quantity * additional_charge
+
+        field = Order._meta.get_field("total_value")
+        if total_value >= 10 ** (field.max_digits - field.decimal_places):
+            raise serializers.ValidationError(
+                "O valor do pedido excede o limite permitido."
+            )
+
+        return total_value
+
+    def decrement_stock(self, snack_lines: list[tuple[Snack, int]]):
+        """Reserva o estoque dos lanches do pedido, notificando as novas quantidades.
+
+        Raises:
+            ValidationError: Se algum item não possuir estoque suficiente.
+        """
+
+        quantities = {snack.pk: quantity for snack, quantity in snack_lines}
+        failed = Snack.objects.decrement_stock(quantities)
+
+        if failed:
+            raise serializers.ValidationError(
+                {
+                    "snacks": [
+                        f'O item "{snack.name}" não possui estoque suficiente.'
+                        for snack, _ in snack_lines
+                        if snack.pk in failed
+                    ]
+                }
+            )
+
+        if quantities:
+            # As quantidades em estoque são lidas na publicação, na ordem das versões.
+            catalog_snapshot.publish_on_commit(lambda: stock_changes(quantities))
+
+    def create(self, validated_data):
+        user = validated_data["user"]
+        snack_lines = validated_data["snack_lines"]
+        ingredient_lines = validated_data["ingredient_lines"]
+
+        with transaction.atomic():
+            self.decrement_stock(snack_lines)
+
+            order = Order.objects.create(
+                total_value=validated_data["total_value"],
+                creation_date=timezone.now(),
+                description=validated_data.get("description"),
+                user=user,
+                creator_user=user,
+            )
+
+            BuySnack.objects.bulk_create(
+                BuySnack(
+                    order=order,
+                    snack=snack,
+                    quantity_product=quantity,
+                    name=snack.name,
+                    unit_price=snack.price,
+                )
+                for snack, quantity in snack_lines
+            )
+            BuyIngredient.objects.bulk_create(
+                BuyIngredient(
+                    order=order,
+                    composition=composition,
+                    ingredient_id=composition.ingredient_id,
+                    quantity_ingredient=quantity,
+                    day=composition.dish.day,
+                    dish_price=composition.dish.price,
+                    ingredient_name=composition.ingredient.name,
+                    additional_charge=composition.ingredient.additional_charge,
+                )
+                for composition, quantity in ingredient_lines
+            )
+
+            register_production(
+                timezone.localdate(order.creation_date),
+                [(snack.pk, quantity) for snack, quantity in snack_lines],
+                [
+                    (composition.dish_id, composition.ingredient_id, quantity)
+                    for composition, quantity in ingredient_lines
+                ],
+            )
+
+            # Notifica os clientes websocket sobre o novo pedido.
+            order_feed.notify_on_commit(
+                {
+                    "event": "created",
+                    "id": order.id,
+                    "user": user.username,
+                    "total_value": format_price(float(order.total_value)),
+                    "snacks": [
+                        {"name": snack.name, "quantity": quantity}
+                        for snack, quantity in snack_lines
+                    ],
+                    "lunch": (
+                        {
+                            "dish": days_week[ingredient_lines[0][0].dish.day],
+                            "ingredients": [
+                                {
+                                    "name": composition.ingredient.name,
+                                    "quantity": quantity,
+                                }
+                                for composition, quantity in ingredient_lines
+                            ],
+                        }
+                        if ingredient_lines
+                        else None
+                    ),
+                },
+                user.id,
+            )
+
+        return order
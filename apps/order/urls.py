@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import OrdersView, OrderView, ProductionView, ExportView
+
+urlpatterns = [
+    path("", OrdersView.as_view(), name="orders"),
+    path("production/", ProductionView.as_view(), name="production"),
+    path("export/", ExportView.as_view(), name="export"),
+    path("<int:order_id>/", OrderView.as_view(), name="order"),
+]
@@ -1,3 +1,353 @@
-from django.shortcuts import render
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework import status
+from django.utils.dateparse import parse_date
+from django.db import transaction
+from django.utils import timezone
+from django.http import Http404, StreamingHttpResponse
+from datetime import datetime, time, timedelta
 
-# Create your views here.
+from core.authentication import SCAuthenticationHttp
+from core.pagination import SCKeysetPagination
+from utils.formatters import format_price
+from core.view import SCView, EMPLOYEE
+from apps.user.models import User
+from apps.snack.models import Snack
+from apps.lunch.models import Dish
+from apps.snack.snapshot import catalog_snapshot, stock_changes
+from core.variables import days_week
+
+from .serializers import OrderSerializer, OrderUpdateSerializer, PlaceOrderSerializer
+from .notifications import order_feed
+from .export import OrderExport
+from .models import (
+    Order,
+    HistoryChangeOrder,
+    ProductionDish,
+    ProductionIngredient,
+    ProductionSnack,
+    register_production,
+)
+
+
+class OrdersView(SCView):
+    permission_classes = [SCAuthenticationHttp]
+    pagination = SCKeysetPagination("creation_date")
+
+    def get(self, request) -> Response:
+        """Retorna o histórico de pedidos, do mais recente ao mais antigo, paginado por cursor.
+
+        Filtros (query string):
+            user: O nome do usuário (apenas funcionários). Os demais usuários obtêm apenas os seus pedidos.
+            fulfilled: `true` ou `false` para os pedidos entregues ou não.
+            unpaid: `true` para os pedidos não pagos ou `false` para os pagos.
+            date: Os pedidos criados em um dia (AAAA-MM-DD).
+            cursor: O cursor da próxima página (`next`) retornado pela página anterior.
+            limit: A quantidade de pedidos por página.
+        """
+
+        orders = self.filter_orders(
+            Order.objects.with_details().filter(deletion_date__isnull=True),
+            request.user,
+            request.query_params,
+        )
+        orders, next_cursor = self.pagination.paginate(
+            orders,
+            request.query_params.get("cursor"),
+            request.query_params.get("limit"),
+        )
+        serializer = OrderSerializer(orders, many=True)
+
+        return Response(
+            {"results": serializer.data, "next": next_cursor},
+            status=status.HTTP_200_OK,
+        )
+
+    def filter_orders(self, orders, user: User, params):
+        if not user.is_employee:
+            orders = orders.filter(user=user)
+
+        elif "user" in params:
+            # O usuário é obtido antes da listagem para utilizar o índice (user, creation_date, id).
+            user_id = (
+                User.objects.filter(username=params["user"])
+                .values_list("pk", flat=True)
+                .first()
+            )
+            orders = orders.filter(user_id=user_id)
+
+        if "fulfilled" in params:
+            orders = orders.filter(
+                order_fulfilled=self.parse_bool(params["fulfilled"], "fulfilled")
+            )
+
+        if "unpaid" in params:
+            orders = orders.filter(
+                final_payment_date__isnull=self.parse_bool(params["unpaid"], "unpaid")
+            )
+
+        if "date" in params:
+            date = parse_date(params["date"]) if params["date"] else None
+
+            if date is None:
+                raise ValidationError("A data deve estar no formato AAAA-MM-DD.")
+
+            # O dia é convertido em um intervalo, mantendo o uso dos índices por creation_date.
+            start = timezone.make_aware(datetime.combine(date, time.min))
+            orders = orders.filter(
+                creation_date__gte=start, creation_date__lt=start + timedelta(days=1)
+            )
+
+        return orders
+
+    @staticmethod
+    def parse_bool(value: str, name: str) -> bool:
+        if value.lower() in ("true", "1"):
+            return True
+
+        if value.lower() in ("false", "0"):
+            return False
+
+        raise ValidationError(f'O filtro "{name}" deve ser "true" ou "false".')
+
+    def post(self, request) -> Response:
+        """Registra um novo pedido do usuário autenticado."""
+
+        serializer = PlaceOrderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = serializer.save(user=request.user)
+
+        return Response(
+            {
+                "message": "Pedido realizado com sucesso.",
+                "order": order.id,
+                "total_value": format_price(float(order.total_value)),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class OrderView(SCView):
+    permission_classes = [SCAuthenticationHttp]
+    access = {"patch": EMPLOYEE}
+
+    def patch(self, request, order_id) -> Response:
+        """Atualiza a entrega, o pagamento ou a descrição de um pedido."""
+
+        serializer = OrderUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        now = timezone.now()
+
+        with transaction.atomic():
+            order = (
+                Order.objects.select_for_update()
+                .filter(pk=order_id, deletion_date__isnull=True)
+                .first()
+            )
+
+            if order is None:
+                raise Http404
+
+            changes, descriptions = {}, []
+
+            if (
+                data.get("order_fulfilled", order.order_fulfilled)
+                != order.order_fulfilled
+            ):
+                order.order_fulfilled = changes["order_fulfilled"] = data[
+                    "order_fulfilled"
+                ]
+                descriptions.append(
+                    "Pedido entregue."
+                    if order.order_fulfilled
+                    else "Entrega do pedido desfeita."
+                )
+
+            if data.get("paid", order.final_payment_date is not None) != (
+                order.final_payment_date is not None
+            ):
+                order.final_payment_date = now if data["paid"] else None
+                changes["final_payment_date"] = (
+                    timezone.localtime(now).isoformat() if data["paid"] else None
+                )
+                descriptions.append(
+                    "Pagamento registrado." if data["paid"] else "Pagamento desfeito."
+                )
+
+            if "description" in data and data["description"] != order.description:
+                order.description = changes["description"] = data["description"]
+                descriptions.append("Descrição alterada.")
+
+            if changes:
+                order.save(update_fields=list(changes))
+                HistoryChangeOrder.objects.create(
+                    order=order,
+                    user=request.user,
+                    description=" ".join(descriptions),
+                    datetime=now,
+                )
+
+                # Notifica a cozinha e o dono do pedido apenas com os campos alterados.
+                event = "fulfilled" if changes.get("order_fulfilled") else "changed"
+                order_feed.notify_on_commit(
+                    {"event": event, "id": order.id, **changes}, order.user_id
+                )
+
+        return Response(
+            {"message": f"Pedido {order_id} atualizado com sucesso."},
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request, order_id) -> Response:
+        """Cancela um pedido, devolvendo os lanches ao estoque e atualizando o resumo de produção."""
+
+        user = request.user
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Bloqueia o pedido para que cancelamentos concorrentes não sejam contabilizados duas vezes.
+            order = (
+                Order.objects.select_for_update()
+                .filter(pk=order_id, deletion_date__isnull=True)
+                .first()
+            )
+
+            if order is None or (not user.is_employee and order.user_id != user.id):
+                raise Http404
+
+            if order.order_fulfilled:
+                raise ValidationError("Um pedido entregue não pode ser cancelado.")
+
+            snack_lines = list(
+                order.purchased_snacks.values_list("snack_id", "quantity_product")
+            )
+            # O resumo de produção é desfeito pelos dados da própria linha, que são mantidos
+            # mesmo após a exclusão da composição. O prato é obtido pelo dia.
+            purchased_lines = list(
+                order.purchased_compositions.filter(
+                    ingredient__isnull=False
+                ).values_list("day", "ingredient_id", "quantity_ingredient")
+            )
+            dishes = dict(
+                Dish.objects.filter(
+                    day__in={day for day, _, _ in purchased_lines}
+                ).values_list("day", "id")
+            )
+            ingredient_lines = [
+                (dishes[day], ingredient_id, quantity)
+                for day, ingredient_id, quantity in purchased_lines
+                if day in dishes
+            ]
+
+            Snack.objects.increment_stock(dict(snack_lines))
+            register_production(
+                timezone.localdate(order.creation_date),
+                snack_lines,
+                ingredient_lines,
+                sign=-1,
+            )
+
+            order.deletion_date = now
+            order.save(update_fields=["deletion_date"])
+            HistoryChangeOrder.objects.create(
+                order=order, user=user, description="Pedido cancelado.", datetime=now
+            )
+
+            order_feed.notify_on_commit(
+                {"event": "cancelled", "id": order.id}, order.user_id
+            )
+
+            if snack_lines:
+                # As quantidades em estoque são lidas na publicação, na ordem das versões.
+                snack_ids = [snack_id for snack_id, _ in snack_lines]
+                catalog_snapshot.publish_on_commit(lambda: stock_changes(snack_ids))
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProductionView(SCView):
+    permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
+
+    def get(self, request) -> Response:
+        """Retorna o resumo de produção de um dia (`date`, AAAA-MM-DD), por padrão o atual.
+
+        Os valores são obtidos do resumo mantido na criação e no cancelamento dos pedidos,
+        sem percorrer os itens dos pedidos.
+        """
+
+        date = request.query_params.get("date")
+        date = parse_date(date) if date else timezone.localdate()
+
+        if date is None:
+            raise ValidationError("A data deve estar no formato AAAA-MM-DD.")
+
+        dishes = (
+            ProductionDish.objects.filter(date=date, portions__gt=0)
+            .select_related("dish")
+            .order_by("dish__day")
+        )
+        ingredients = (
+            ProductionIngredient.objects.filter(date=date, portions__gt=0)
+            .select_related("ingredient")
+            .order_by("ingredient__name")
+        )
+        snacks = (
+            ProductionSnack.objects.filter(date=date, quantity__gt=0)
+            .select_related("snack")
+            .order_by("snack__name")
+        )
+
+        ingredients_by_dish = {}
+        for production in ingredients:
+            ingredients_by_dish.setdefault(production.dish_id, []).append(
+                {
+                    "name": production.ingredient.name,
+                    "portions": production.portions,
+                    "quantity": production.quantity,
+                }
+            )
+
+        return Response(
+            {
+                "date": date,
+                "dishes": [
+                    {
+                        "dish_name": days_week[production.dish.day],
+                        "portions": production.portions,
+                        "ingredients": ingredients_by_dish.get(production.dish_id, []),
+                    }
+                    for production in dishes
+                ],
+                "snacks": [
+                    {"name": production.snack.name, "quantity": production.quantity}
+                    for production in snacks
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ExportView(SCView):
+    permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
+
+    def get(self, request) -> StreamingHttpResponse:
+        """Exporta os pedidos de um período (`since` e `until`, AAAA-MM-DD) em CSV ou JSONL (`type`).
+
+        O conteúdo é enviado à medida que é gerado, com uso de memória constante.
+        """
+
+        params = request.query_params
+        export = OrderExport.for_period(
+            params.get("since"), params.get("until"), format=params.get("type", "csv")
+        )
+
+        response = StreamingHttpResponse(
+            export.stream(), content_type=export.content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="pedidos.{export.format}"'
+        )
+        return response
@@ -0,0 +1,260 @@
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
+from django.db.models import Max
+from django.utils import timezone
+from django.conf import settings
+from threading import Lock
+import hashlib
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Filtro de Bloom: responde se um item certamente não foi adicionado ou se talvez foi."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(item)
+        )
+
+
+class SCTokenBlacklist:
+    """Verificação dos tokens de atualização revogados com um filtro de Bloom em memória.
+
+    O filtro contém o `jti` de todos os tokens revogados ainda não expirados até a última
+    revogação obtida (`_last_id`). Um token ausente do filtro não foi revogado até a última
+    sincronização e é aceito sem consultar a tabela de revogação; apenas os tokens presentes
+    no filtro (revogados ou falsos positivos) são confirmados no banco de dados.
+
+    Como as transações podem ser confirmadas fora da ordem dos ids, cada sincronização
+    relê as últimas `sync_window` revogações anteriores à última obtida, adicionando ao
+    filtro apenas as ainda não vistas.
+
+    A sincronização é feita a cada `TOKEN_BLACKLIST_SYNC_INTERVAL` segundos, e as revogações
+    feitas por outros processos nesse intervalo podem não estar no filtro. A revogação do
+    token, feita em todos os usos do token de atualização, é a verificação definitiva: um
+    token já revogado não é revogado novamente e é recusado.
+    """
+
+    error_rate = 0.01
+    # Quantidade de ids anteriores ao último obtido relidos em cada sincronização.
+    sync_window = 100
+
+    def __init__(self):
+        self._lock = Lock()
+        self._filter: BloomFilter | None = None
+        self._last_id = 0
+        self._recent_ids: set[int] = set()
+        self._synced_at = 0.0
+        self.metrics = {"checks": 0, "filtered": 0, "revoked": 0, "false_positives": 0}
+
+    @property
+    def capacity(self) -> int:
+        return getattr(settings, "TOKEN_BLACKLIST_FILTER_CAPACITY", 100_000)
+
+    @property
+    def sync_interval(self) -> float:
+        return getattr(settings, "TOKEN_BLACKLIST_SYNC_INTERVAL", 5)
+
+    def contains(self, jti: str) -> bool:
+        """Retorna se o token foi revogado (até a última sincronização do filtro)."""
+
+        bloom = self.sync()
+        self.metrics["checks"] += 1
+
+        if jti not in bloom:
+            self.metrics["filtered"] += 1
+            return False
+
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        self.metrics["revoked" if revoked else "false_positives"] += 1
+
+        return revoked
+
+    def add(self, jti: str):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def sync(self, force: bool = False) -> BloomFilter:
+        """Adiciona ao filtro as revogações registradas desde a última sincronização.
+
+        Args:
+            force (bool, optional): Sincroniza mesmo antes do fim do intervalo.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                self._load()
+                self._synced_at = now
+                return self._filter
+
+            if not force and now - self._synced_at < self.sync_interval:
+                return self._filter
+
+            self._synced_at = now
+            bloom, last_id = self._filter, self._last_id
+
+        rows = list(
+            BlacklistedToken.objects.filter(id__gt=max(0, last_id - self.sync_window))
+            .order_by("id")
+            .values_list("id", "token__jti")
+        )
+
+        with self._lock:
+            # O filtro pode ter sido reconstruído durante a consulta.
+            if bloom is self._filter:
+                self._add_rows(rows)
+
+        return bloom
+
+    def _add_rows(self, rows: list[tuple[int, str]]):
+        """Adiciona ao filtro as revogações ainda não vistas da janela de sincronização."""
+
+        for pk, jti in rows:
+            if pk not in self._recent_ids:
+                self._filter.add(jti)
+                self._recent_ids.add(pk)
+
+        if rows:
+            self._last_id = max(self._last_id, rows[-1][0])
+
+        floor = self._last_id - self.sync_window
+        self._recent_ids = {pk for pk in self._recent_ids if pk > floor}
+
+    def _load(self):
+        """Reconstrói o filtro com as revogações ainda não expiradas."""
+
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+        jtis = BlacklistedToken.objects.filter(
+            id__lte=last_id - self.sync_window, token__expires_at__gt=timezone.now()
+        ).values_list("token__jti", flat=True)
+
+        # A capacidade é ampliada caso existam mais revogações do que o configurado.
+        bloom = BloomFilter(max(self.capacity, jtis.count() * 2), self.error_rate)
+        for jti in jtis.iterator():
+            bloom.add(jti)
+
+        self._filter = bloom
+        self._recent_ids = set()
+        # As revogações da janela (incluindo as de transações ainda não confirmadas) são
+        # obtidas pelas sincronizações.
+        self._last_id = last_id
+        self._add_rows(
+            list(
+                BlacklistedToken.objects.filter(
+                    id__gt=max(0, last_id - self.sync_window)
+                )
+                .order_by("id")
+                .values_list("id", "token__jti")
+            )
+        )
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def prune(self, batch_size: int = 5000) -> dict[str, int]:
+        """Remove os tokens expirados (e as suas revogações) em lotes.
+
+        Tokens expirados são recusados na verificação da assinatura, não sendo necessário
+        mantê-los na lista de revogação.
+        """
+
+        now = timezone.now()
+        deleted = {"outstanding": 0, "blacklisted": 0}
+
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by()
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            _, counts = OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted["outstanding"] += counts.get(OutstandingToken._meta.label, 0)
+            deleted["blacklisted"] += counts.get(BlacklistedToken._meta.label, 0)
+
+        self.reset()
+        logger.info(
+            "Tokens expirados removidos: %d emitidos e %d revogados.",
+            deleted["outstanding"],
+            deleted["blacklisted"],
+        )
+
+        return deleted
+
+    @staticmethod
+    def table_sizes() -> dict[str, int]:
+        """Retorna a quantidade de registros das tabelas de tokens."""
+
+        return {
+            "outstanding": OutstandingToken.objects.count(),
+            "blacklisted": BlacklistedToken.objects.count(),
+            "expired": OutstandingToken.objects.filter(
+                expires_at__lte=timezone.now()
+            ).count(),
+        }
+
+
+token_blacklist = SCTokenBlacklist()
+
+
+class SCRefreshToken(RefreshToken):
+    """Token de atualização verificado pelo filtro de revogação (`token_blacklist`)."""
+
+    def check_blacklist(self):
+        if token_blacklist.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("O token foi revogado.")
+
+    def blacklist(self):
+        """Revoga o token.
+
+        Raises:
+            TokenError: Se o token já havia sido revogado (ex.: por outro processo).
+        """
+
+        # A revogação é única por token (`OneToOneField`): uma revogação concorrente ou
+        # anterior resulta em `created` falso.
+        blacklisted, created = super().blacklist()
+
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+
+        if not created:
+            raise TokenError("O token foi revogado.")
+
+        return blacklisted, created
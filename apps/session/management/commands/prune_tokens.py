@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.session.blacklist import token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove os tokens de atualização expirados e as suas revogações, exibindo o "
+        "tamanho das tabelas antes e depois. Deve ser executado periodicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas exibe o tamanho das tabelas, sem remover registros.",
+        )
+
+    def handle(self, *args, **options):
+        before = token_blacklist.table_sizes()
+        self.stdout.write(
+            f"Tokens emitidos: {before['outstanding']} | revogados: {before['blacklisted']} | "
+            f"expirados: {before['expired']}"
+        )
+
+        if options["dry_run"]:
+            return
+
+        deleted = token_blacklist.prune(options["batch_size"])
+        after = token_blacklist.table_sizes()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removidos {deleted['outstanding']} tokens emitidos e "
+                f"{deleted['blacklisted']} revogados. Restantes: {after['outstanding']} "
+                f"emitidos e {after['blacklisted']} revogados."
+            )
+        )
@@ -2,21 +2,28 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework import serializers
 from apps.user.models import User
 
+from core.hashing import password_hashing
+
 
 class LoginSerializer(serializers.Serializer):
     email = serializers.CharField()
     password = serializers.CharField()
 
-    def validate(self, attrs):
-        email = attrs.get("email")
-        password = attrs.get("password")
+    async def authenticate(self) -> User:
+        """Retorna o usuário das credenciais informadas.
+
+        A senha é verificada no pool de hashing (`core.hashing`), sem ocupar a thread da
+        requisição enquanto o hash é calculado.
+        """
+
+        email = self.validated_data["email"]
+        password = self.validated_data["password"]
 
-        user = User.objects.filter(email=email).first()
-        if user is None or not user.check_password(password):
+        user = await User.objects.filter(email=email).afirst()
+        if not await password_hashing.acheck_password(user, password):
             # Retorna erro caso o usuário não exista ou se a senha estiver incorreta.
             raise AuthenticationFailed(
                 "Credenciais inválidas. Por favor, tente novamente."
             )
 
-        attrs["user"] = user
-        return attrs
+        return user
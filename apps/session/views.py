@@ -2,38 +2,46 @@ from rest_framework.exceptions import (
     AuthenticationFailed,
     ValidationError,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.response import Response
 from rest_framework import status
+from asgiref.sync import sync_to_async
 
-from core.view import SCView
+from core.view import SCView, SCAsyncView
 from core.authentication import SCAuthenticationHttp
+from core.throttling import SCSlidingWindowThrottle
 from apps.user.models import User
 
 from .serializers import LoginSerializer
+from .blacklist import SCRefreshToken
 from .utils import generate_response_with_cookie
 
 
-class LoginView(SCView):
-    throttle_classes = [ScopedRateThrottle]
+class LoginView(SCAsyncView):
+    throttle_classes = [SCSlidingWindowThrottle]
     throttle_scope = "limited_access"
 
-    def post(self, request):
+    async def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        # A senha é verificada sem ocupar uma thread (ver `core.hashing`).
+        user = await serializer.authenticate()
+
+        return await sync_to_async(self.login)(request, user)
+
+    def login(self, request, user: User) -> Response:
+        """Revoga o token de atualização anterior e gera os novos tokens do usuário."""
+
         prev_token = request.COOKIES.get("refresh_token")
         if prev_token:
             try:
-                invalid_token = RefreshToken(prev_token)
+                invalid_token = SCRefreshToken(prev_token)
                 invalid_token.blacklist()
             except:
                 # O token já é inválido.
                 pass
 
-        user = serializer.validated_data["user"]
-        new_token = RefreshToken.for_user(user)
+        new_token = SCRefreshToken.for_user(user)
         data = {
             "username": user.username,
             "role": "employee" if user.is_employee else "client",
@@ -44,7 +52,7 @@ class LoginView(SCView):
 
 class LogoutView(SCView):
     permission_classes = [SCAuthenticationHttp]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SCSlidingWindowThrottle]
     throttle_scope = "limited_access"
 
     def post(self, request):
@@ -54,7 +62,7 @@ class LogoutView(SCView):
             raise ValidationError("O token de atualização é obrigatório.")
 
         try:
-            invalid_token = RefreshToken(refresh_token)
+            invalid_token = SCRefreshToken(refresh_token)
             invalid_token.blacklist()
 
         except:
@@ -75,7 +83,7 @@ class RefreshView(SCView):
     O token de refresh tem validade para apenas um uso.
     """
 
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SCSlidingWindowThrottle]
     throttle_scope = "limited_access"
 
     def post(self, request) -> Response:
@@ -86,11 +94,11 @@ class RefreshView(SCView):
 
         try:
             # Revogação do token de atualização anterior.
-            prev_token = RefreshToken(refresh_token)
+            prev_token = SCRefreshToken(refresh_token)
             prev_token.blacklist()
 
             user = User.objects.filter(id=prev_token["user_id"]).first()
-            new_refresh_token = RefreshToken.for_user(user)
+            new_refresh_token = SCRefreshToken.for_user(user)
 
             data = {"message": "Tokens atualizados."}
             return generate_response_with_cookie(new_refresh_token, data)
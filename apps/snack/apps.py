@@ -1,6 +1,14 @@
+from django.core.management import call_command
+from django.db.models.signals import post_migrate
 from django.apps import AppConfig
 
 
 class SnackConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.snack"
+
+    def ready(self):
+        post_migrate.connect(self.check_categories, sender=self)
+
+    def check_categories(self, sender, **kwargs):
+        call_command("check_categories")
@@ -1,8 +1,6 @@
-from channels.db import database_sync_to_async
 from core.consumers import SCWebsocketConsumer
 
-from .models import SnackCategory
-from .serializers import CategorySerializer
+from .snapshot import catalog_snapshot
 
 
 class SnacksConsumer(SCWebsocketConsumer):
@@ -11,6 +9,10 @@ class SnacksConsumer(SCWebsocketConsumer):
     Este consumer mantém uma conexão WebSocket com o cliente para enviar atualizações
     sobre mudanças no estoque de lanches. Ele também gerencia a autorização do usuário
     e a comunicação em grupo para atualizações em tempo real.
+
+    Ao conectar, o cliente recebe o catálogo completo ou, caso informe a sua última
+    versão (`?version=N`), apenas as alterações (deltas) a partir dela. A mesma
+    sincronização pode ser solicitada a qualquer momento com a mensagem `{"version": N}`.
     """
 
     async def connect(self):
@@ -20,7 +22,7 @@ class SnacksConsumer(SCWebsocketConsumer):
         user = await self.get_user()
         if user and user.is_employee:
             await self.channel_layer.group_add(self.group_name, self.channel_name)
-            await self.send_stock_snacks()
+            await self.send_stock_snacks(self.get_client_version())
             return
 
         await self.close(code=4003, reason="Usuário não autorizado.")
@@ -28,25 +30,17 @@ class SnacksConsumer(SCWebsocketConsumer):
     async def disconnect(self, _):
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def snacks_update(self, _):
-        await self.send_stock_snacks()
+    async def receive_json(self, content):
+        """Reenvia as alterações a partir da versão informada pelo cliente."""
 
-    async def send_stock_snacks(self):
-        """Obtém e envia o estado atual dos lanches para o cliente."""
+        await self.send_stock_snacks(self.get_client_version(content))
 
-        stock_snacks = await self.get_snacks()
-        await self.send_json(stock_snacks)
+    async def snacks_update(self, event):
+        """Repassa ao cliente a alteração já codificada enviada pelo remetente da mensagem."""
 
-    @database_sync_to_async
-    def get_snacks(self):
-        """Obtém todas as categorias e lanches ativos do banco de dados.
+        await self.send(text_data=event["message"])
 
-        Returns:
-            list: Lista serializada de categorias e seus lanches associados.
-        """
+    async def send_stock_snacks(self, version: int | None = None):
+        """Envia o estado dos lanches para o cliente a partir da sua última versão."""
 
-        categories = SnackCategory.objects.filter(deletion_date__isnull=True).order_by(
-            "position_order"
-        )
-        serializer = CategorySerializer(categories, many=True)
-        return serializer.data
+        await self.send_snapshot(catalog_snapshot, version)
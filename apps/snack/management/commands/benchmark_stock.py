@@ -0,0 +1,97 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction, OperationalError
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import time
+import uuid
+
+from apps.snack.models import SnackCategory, Snack
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa compras concorrentes de um mesmo item para medir a vazão do decremento "
+        "de estoque e verificar que não há venda excedente. Os registros temporários "
+        "criados no banco de dados configurado são removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--purchases", type=int, default=2000)
+        parser.add_argument("--stock", type=int, default=1000)
+        parser.add_argument("--quantity", type=int, default=1)
+
+    def handle(self, *args, **options):
+        # Os registros temporários são criados como excluídos, não sendo exibidos no catálogo.
+        name = f"benchmark-{uuid.uuid4().hex[:8]}"
+        category = SnackCategory.objects.create(
+            name=name, position_order=0, deletion_date=timezone.now()
+        )
+        snack = Snack.objects.create(
+            name=name,
+            price=1,
+            quantity_in_stock=options["stock"],
+            category=category,
+            deletion_date=timezone.now(),
+        )
+
+        counters = {"sold": 0, "rejected": 0, "errors": 0}
+        lock = Lock()
+
+        def purchase(_):
+            try:
+                with transaction.atomic():
+                    failed = Snack.objects.decrement_stock(
+                        {snack.pk: options["quantity"]}
+                    )
+                result = "rejected" if failed else "sold"
+
+            except OperationalError:
+                # Ex.: "database is locked" no SQLite sob alta concorrência.
+                result = "errors"
+
+            with lock:
+                counters[result] += 1
+
+        def run(purchases):
+            try:
+                for index in purchases:
+                    purchase(index)
+            finally:
+                connection.close()
+
+        batches = [
+            range(index, options["purchases"], options["threads"])
+            for index in range(options["threads"])
+        ]
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+                list(executor.map(run, batches))
+            elapsed = time.perf_counter() - start
+
+            snack.refresh_from_db()
+
+        finally:
+            category.delete()
+
+        sold_units = counters["sold"] * options["quantity"]
+        oversell = max(0, sold_units - options["stock"])
+        lost_updates = options["stock"] - sold_units - snack.quantity_in_stock
+
+        self.stdout.write(
+            f"Banco de dados: {connection.vendor} | threads: {options['threads']}\n"
+            f"Compras: {options['purchases']} em {elapsed:.2f}s "
+            f"({options['purchases'] / elapsed:.0f} compras/s)\n"
+            f"Vendidas: {counters['sold']} | sem estoque: {counters['rejected']} | "
+            f"erros: {counters['errors']}\n"
+            f"Estoque final: {snack.quantity_in_stock} | venda excedente: {oversell} | "
+            f"atualizações perdidas: {lost_updates}"
+        )
+
+        if oversell or lost_updates or snack.quantity_in_stock < 0:
+            self.stderr.write(self.style.ERROR("Inconsistência no estoque detectada."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Nenhuma venda excedente."))
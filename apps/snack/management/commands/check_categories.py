@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.snack.models import SnackCategory
+
+
+class Command(BaseCommand):
+    help = "Verifica se a posição das categorias ativas é sequencial (1, 2, ..., N), corrigindo-a caso não seja."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = SnackCategory.objects.renumber()
+
+        if changed:
+            self.stdout.write(
+                f"A posição de {len(changed)} categoria(s) foi corrigida."
+            )
@@ -1,4 +1,55 @@
-from django.db import models
+from django.db import models, transaction
+
+
+class SnackCategoryQuerySet(models.QuerySet):
+    def renumber(
+        self, positions: dict[str, int] | None = None
+    ) -> list["SnackCategory"]:
+        """Renumera `position_order` das categorias ativas de forma densa (1, 2, ..., N).
+
+        As categorias informadas em `positions` (nome -> posição desejada) são ordenadas
+        pela nova posição e as demais mantêm a posição atual, sendo os intervalos e
+        repetições removidos. Deve ser executado dentro de uma transação.
+
+        Returns:
+            list[SnackCategory]: As categorias cuja posição foi alterada.
+        """
+
+        positions = positions or {}
+        categories = self.filter(deletion_date__isnull=True).select_for_update()
+
+        ordered = sorted(
+            categories,
+            key=lambda category: (
+                positions.get(category.name, category.position_order),
+                category.name not in positions,
+                category.position_order,
+                category.id,
+            ),
+        )
+
+        changed = []
+        for index, category in enumerate(ordered):
+            if category.position_order != index + 1:
+                category.position_order = index + 1
+                changed.append(category)
+
+        self.bulk_update(changed, ["position_order"])
+        return changed
+
+    def next_position(self) -> int:
+        """Retorna a posição de uma nova categoria ativa (maior posição + 1).
+
+        As categorias ativas são bloqueadas (como em `renumber`), serializando as criações
+        concorrentes. A maior posição é obtida em uma nova consulta, após o bloqueio, para
+        considerar a categoria criada pela transação que o mantinha. Deve ser executado
+        dentro de uma transação.
+        """
+
+        active = self.filter(deletion_date__isnull=True)
+        list(active.select_for_update().values_list("pk", flat=True))
+
+        return (active.aggregate(last=models.Max("position_order"))["last"] or 0) + 1
 
 
 class SnackCategory(models.Model):
@@ -8,8 +59,18 @@ class SnackCategory(models.Model):
     path_img = models.CharField(max_length=255, blank=True, null=True)
     deletion_date = models.DateTimeField(blank=True, null=True)
 
+    objects = SnackCategoryQuerySet.as_manager()
+
     class Meta:
         db_table = "Category"
+        constraints = [
+            # Nome único entre os registros ativos (também utilizado nas buscas por nome).
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="unique_active_category_name",
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -33,6 +94,73 @@ class Description(models.Model):
         return f"{self.category.name} - Description"
 
 
+class SnackQuerySet(models.QuerySet):
+    def decrement_stock(
+        self, quantities: dict[int, int], attempts: int = 3
+    ) -> list[int]:
+        """Decrementa o estoque de um conjunto de itens de forma atômica e sem venda excedente.
+
+        Todos os itens são decrementados em uma única instrução condicional
+        (`UPDATE ... SET quantity_in_stock = quantity_in_stock - n WHERE quantity_in_stock >= n`).
+        Caso algum item não possua estoque suficiente, nenhuma alteração é mantida. Deve ser
+        executado dentro de uma transação.
+
+        Args:
+            quantities (dict[int, int]): A quantidade a ser decrementada por item (pk -> quantidade).
+            attempts (int, optional): O número de tentativas caso o estoque seja reposto durante
+                a verificação dos itens sem estoque.
+
+        Returns:
+            list[int]: Os itens (pk) sem estoque suficiente. Vazio caso o estoque tenha sido decrementado.
+        """
+
+        if not quantities:
+            return []
+
+        quantity = models.Case(
+            *(models.When(pk=pk, then=models.Value(n)) for pk, n in quantities.items()),
+            output_field=models.IntegerField(),
+        )
+        items = self.filter(pk__in=quantities)
+
+        for _ in range(attempts):
+            savepoint = transaction.savepoint()
+            updated = items.filter(quantity_in_stock__gte=quantity).update(
+                quantity_in_stock=models.F("quantity_in_stock") - quantity
+            )
+
+            if updated == len(quantities):
+                transaction.savepoint_commit(savepoint)
+                return []
+
+            transaction.savepoint_rollback(savepoint)
+
+            failed = list(
+                items.filter(quantity_in_stock__lt=quantity).values_list(
+                    "pk", flat=True
+                )
+            )
+            if failed:
+                return failed
+
+        return list(quantities)
+
+    def increment_stock(self, quantities: dict[int, int]) -> int:
+        """Devolve ao estoque as quantidades informadas (pk -> quantidade) em uma única instrução."""
+
+        if not quantities:
+            return 0
+
+        quantity = models.Case(
+            *(models.When(pk=pk, then=models.Value(n)) for pk, n in quantities.items()),
+            output_field=models.IntegerField(),
+        )
+
+        return self.filter(pk__in=quantities).update(
+            quantity_in_stock=models.F("quantity_in_stock") + quantity
+        )
+
+
 class Snack(models.Model):
     id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=50)
@@ -45,8 +173,18 @@ class Snack(models.Model):
         SnackCategory, on_delete=models.CASCADE, related_name="snacks"
     )
 
+    objects = SnackQuerySet.as_manager()
+
     class Meta:
         db_table = "Snack"
+        constraints = [
+            # Nome único entre os registros ativos (também utilizado nas buscas por nome).
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(deletion_date__isnull=True),
+                name="unique_active_snack_name",
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,27 @@
+from core.resolver import SCResolver
+
+from .models import SnackCategory, Snack
+from .snapshot import catalog_snapshot
+
+
+def load_category(category_name: str) -> SnackCategory | None:
+    return SnackCategory.objects.filter(
+        name=category_name, deletion_date__isnull=True
+    ).first()
+
+
+def load_snack(category_name: str, snack_name: str) -> Snack | None:
+    return (
+        Snack.objects.filter(
+            name=snack_name,
+            deletion_date__isnull=True,
+            category__name=category_name,
+            category__deletion_date__isnull=True,
+        )
+        .select_related("category")
+        .first()
+    )
+
+
+category_resolver = SCResolver(catalog_snapshot, load_category)
+snack_resolver = SCResolver(catalog_snapshot, load_snack)
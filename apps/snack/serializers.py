@@ -20,6 +20,8 @@ class SnackSerializer(SCSerializer):
         ]
 
         extra_kwargs = {
+            # A unicidade do nome é garantida pela restrição do banco de dados (ver `integrity_error_for_name`).
+            "name": {"validators": []},
             "price": {
                 "error_messages": {
                     "invalid": "Por favor, insira um valor numérico válido para o preço.",
@@ -33,17 +35,18 @@ class SnackSerializer(SCSerializer):
 
         return format_price(value, to_float=True)
 
-    def validate_name(self, value):
-        check_snack = Snack.objects.filter(
-            name=value, deletion_date__isnull=True, category__deletion_date__isnull=True
-        ).first()
+    def integrity_error_for_name(self, value):
+        """Retorna o erro caso exista outro item ativo com o mesmo nome."""
 
-        if check_snack:
-            raise serializers.ValidationError(
-                f'O item "{value}" já existe na categoria "{check_snack.category.name}".'
-            )
+        check_snack = (
+            Snack.objects.filter(name=value, deletion_date__isnull=True)
+            .exclude(pk=getattr(self.instance, "pk", None))
+            .select_related("category")
+            .first()
+        )
 
-        return value
+        if check_snack:
+            return f'O item "{value}" já existe na categoria "{check_snack.category.name}".'
 
     def validate_quantity_in_stock(self, value):
         # O mínimo existente no estoque deve ser 0.
@@ -67,6 +70,43 @@ class SnackSerializer(SCSerializer):
 
         return format_price(float(value))
 
+    def update(self, instance, validated_data):
+        """Atualiza apenas os campos informados do item.
+
+        O estoque não é salvo a partir da instância, o que desfaria os decrementos realizados
+        pelos pedidos após o seu carregamento. A diferença entre a quantidade informada e a
+        carregada é aplicada com uma expressão F() (`increment_stock`/`decrement_stock`).
+        """
+
+        quantity = validated_data.pop("quantity_in_stock", None)
+
+        for key, value in validated_data.items():
+            setattr(instance, key, value)
+
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
+
+        if quantity is not None:
+            difference = quantity - instance.quantity_in_stock
+
+            if difference > 0:
+                Snack.objects.increment_stock({instance.pk: difference})
+
+            elif difference < 0 and Snack.objects.decrement_stock(
+                {instance.pk: -difference}
+            ):
+                raise serializers.ValidationError(
+                    {
+                        "quantity_in_stock": [
+                            "O estoque foi alterado por um pedido durante a edição. Por favor, tente novamente."
+                        ]
+                    }
+                )
+
+            instance.refresh_from_db(fields=["quantity_in_stock"])
+
+        return instance
+
 
 class DescriptionSerializer(SCSerializer):
     category = serializers.CharField(source="category.name")
@@ -89,29 +129,37 @@ class CategorySerializer(SCSerializer):
         ]
         model = SnackCategory
 
+        extra_kwargs = {
+            # A unicidade do nome é garantida pela restrição do banco de dados (ver `integrity_error_for_name`).
+            "name": {"validators": []},
+        }
+
     def get_snacks(self, obj):
         """Obtem todos os produtos não excluídos relacionados à categoria e ordena pelo nome."""
 
-        snacks = obj.snacks.filter(deletion_date__isnull=True).order_by("name")
+        # Utiliza os produtos pré-carregados pelo snapshot do catálogo, quando disponíveis.
+        snacks = getattr(obj, "active_snacks", None)
+        if snacks is None:
+            snacks = obj.snacks.filter(deletion_date__isnull=True).order_by("name")
+
         return SnackSerializer(snacks, many=True, remove_field=["category"]).data
 
-    def validate_name(self, value):
-        """Verifica se existe uma categoria ativa com o mesmo nome."""
+    def integrity_error_for_name(self, value):
+        """Retorna o erro caso exista outra categoria ativa com o mesmo nome."""
 
-        if SnackCategory.objects.filter(name=value, deletion_date__isnull=True):
-            raise serializers.ValidationError(f'A categoria "{value}" já existe.')
-        return value
+        if (
+            SnackCategory.objects.filter(name=value, deletion_date__isnull=True)
+            .exclude(pk=getattr(self.instance, "pk", None))
+            .exists()
+        ):
+            return f'A categoria "{value}" já existe.'
 
     def create(self, validated_data):
         """Cria uma nova categoria vazia."""
 
-        active_category_count = SnackCategory.objects.filter(
-            deletion_date__isnull=True
-        ).count()
-
         with transaction.atomic():
             new_category = SnackCategory(**validated_data)
-            new_category.position_order = active_category_count + 1
+            new_category.position_order = SnackCategory.objects.next_position()
             new_category.save()
 
             description = Description(
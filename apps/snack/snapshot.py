@@ -0,0 +1,91 @@
+from django.db.models import Prefetch
+
+from core.snapshot import SCSnapshot, change
+
+from .models import SnackCategory, Snack
+from .serializers import CategorySerializer, SnackSerializer
+
+
+class CatalogSnapshot(SCSnapshot):
+    """Catálogo de lanches (categorias ativas e seus itens) compartilhado entre HTTP e WebSocket."""
+
+    name = "catalog"
+    group_name = "snacks_group"
+    type_message = "snacks_update"
+
+    def build(self):
+        """Obtém todas as categorias e lanches ativos em uma quantidade fixa de consultas."""
+
+        active_snacks = Snack.objects.filter(deletion_date__isnull=True).order_by(
+            "name"
+        )
+
+        categories = (
+            SnackCategory.objects.filter(deletion_date__isnull=True)
+            .select_related("description")
+            .prefetch_related(
+                Prefetch("snacks", queryset=active_snacks, to_attr="active_snacks")
+            )
+            .order_by("position_order")
+        )
+
+        return CategorySerializer(categories, many=True).data
+
+    def select(self, data, part):
+        """Permite obter os dados de uma categoria, sem os seus itens, pelo nome."""
+
+        if part is None:
+            return data
+
+        for category in data:
+            if category["name"] == part:
+                return {
+                    key: value for key, value in category.items() if key != "snacks"
+                }
+
+        raise KeyError(part)
+
+
+def category_change(category: SnackCategory, key: str | None = None) -> dict:
+    """Cria o delta com os dados atuais de uma categoria (sem os seus itens)."""
+
+    data = CategorySerializer(category, remove_field=["snacks"]).data
+    data["position_order"] = category.position_order
+
+    return change("upsert", "category", key or category.name, data)
+
+
+def position_change(category: SnackCategory) -> dict:
+    """Cria o delta com a nova posição de uma categoria."""
+
+    return change(
+        "upsert", "category", category.name, {"position_order": category.position_order}
+    )
+
+
+def snack_change(snack: Snack, key: str | None = None) -> dict:
+    """Cria o delta com os dados atuais de um item, incluindo o nome da sua categoria."""
+
+    data = SnackSerializer(snack, remove_field=["category"]).data
+    data["category"] = snack.category.name
+
+    return change("upsert", "snack", key or snack.name, data)
+
+
+def stock_change(name: str, quantity_in_stock: int) -> dict:
+    """Cria o delta com a quantidade atual em estoque de um item."""
+
+    return change("upsert", "snack", name, {"quantity_in_stock": quantity_in_stock})
+
+
+def stock_changes(snack_ids) -> list[dict]:
+    """Cria os deltas com as quantidades atuais em estoque dos itens informados."""
+
+    stock = Snack.objects.filter(pk__in=snack_ids).values_list(
+        "name", "quantity_in_stock"
+    )
+
+    return [stock_change(name, quantity) for name, quantity in stock]
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -1,40 +1,37 @@
 from rest_framework.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
 from rest_framework.request import Request
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from django.utils import timezone
 
 from core.authentication import SCAuthenticationHttp
-from utils.message import dispatch_message_websocket
 from utils.formatters import format_price
-from core.view import SCView
-from apps.user.models import User
+from core.snapshot import change
+from core.view import SCView, EMPLOYEE, PUBLIC
 
-from .models import SnackCategory, Snack
+from .models import SnackCategory
 from .serializers import CategorySerializer, SnackSerializer
+from .snapshot import (
+    catalog_snapshot,
+    category_change,
+    position_change,
+    snack_change,
+    stock_changes,
+)
+from .resolvers import category_resolver, snack_resolver
 
 
 class SnackCategoriesView(SCView):
     permission_classes = [SCAuthenticationHttp]
-    ignore_validation_for_methods = ["get"]
-
-    def validate_before_access(self, user, _):
-        """Verifica se o usuário tem autorização para acessar os endpoints post e patch."""
-
-        return user.is_employee
+    default_access = EMPLOYEE
+    access = {"get": PUBLIC}
 
     def get(self, _):
         """Retorna todas as categorias e lanches."""
 
-        # Ordena as categorias por `position_order`.
-        categories = SnackCategory.objects.filter(deletion_date__isnull=True).order_by(
-            "position_order"
-        )
-        serializer = CategorySerializer(categories, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.snapshot_response(catalog_snapshot)
 
     def post(self, request) -> Response:
         """Cria uma nova categoria."""
@@ -44,10 +41,10 @@ class SnackCategoriesView(SCView):
             remove_field=["snacks"],
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        new_category = serializer.save()
 
         # Notifica todos os clientes websocket sobre a nova categoria no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        catalog_snapshot.publish_on_commit([category_change(new_category)])
 
         return Response(
             {"message": "Categoria criada com sucesso."}, status=status.HTTP_201_CREATED
@@ -58,18 +55,16 @@ class SnackCategoriesView(SCView):
 
         new_order = request.data.get("update_position_order", None)
         if new_order:
+            # Nomes desconhecidos são ignorados e a numeração é mantida sem intervalos.
+            positions = {name: index + 1 for index, name in enumerate(new_order)}
+
             with transaction.atomic():
-                for index, name in enumerate(new_order):
-                    category = SnackCategory.objects.filter(
-                        deletion_date__isnull=True,
-                        name=name,
-                    ).first()
-                    if category:
-                        category.position_order = index + 1
-                        category.save()
+                changed = SnackCategory.objects.renumber(positions)
 
             # Notifica todos os clientes websocket sobre a edição da posição das categorias.
-            dispatch_message_websocket("snacks_group", "snacks_update")
+            catalog_snapshot.publish_on_commit(
+                [position_change(category) for category in changed]
+            )
 
             return Response(
                 {"message": "Posição das categorias atualizada com sucesso."},
@@ -81,32 +76,27 @@ class SnackCategoriesView(SCView):
 
 class CategoryView(SCView):
     permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
 
     def dispatch(self, request, *args, **kwargs):
         """Verifica se a categoria existe antes de acessar os endpoints."""
 
         category_name = kwargs.get("category_name")
 
-        query_category = get_object_or_404(
-            SnackCategory, name=category_name, deletion_date__isnull=True
-        )
+        # Os dados da categoria são obtidos do catálogo pré-renderizado, sem acesso ao banco de dados.
+        if request.method == "GET":
+            kwargs["category"] = None
+            return super().dispatch(request, *args, **kwargs)
+
+        query_category = category_resolver.resolve_or_404(category_name, for_write=True)
         kwargs["category"] = query_category
 
         return super().dispatch(request, *args, **kwargs)
 
-    def validate_before_access(self, user: User, _) -> bool:
-        """Verifica se o usuário tem autorização para acessar qualquer endpoint."""
-
-        return user.is_employee
-
     def get(self, _, category_name, category):
         """Retorna os dados da categoria."""
 
-        serializer = CategorySerializer(
-            category,
-            remove_field=["snacks"],
-        )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.snapshot_response(catalog_snapshot, category_name)
 
     def post(self, request, category_name, category):
         """Cria um novo item (Snack) na categoria."""
@@ -116,10 +106,10 @@ class CategoryView(SCView):
 
         serializer = SnackSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        new_snack = serializer.save()
 
         # Notifica todos os clientes websocket sobre o novo item no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        catalog_snapshot.publish_on_commit([snack_change(new_snack)])
 
         return Response(
             {"message": f"Item criado com sucesso na categoria {category_name}."},
@@ -139,7 +129,7 @@ class CategoryView(SCView):
         serializer.save()
 
         # Notifica todos os clientes websocket sobre a edição da categoria no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        catalog_snapshot.publish_on_commit([category_change(category, category_name)])
 
         return Response(
             {"message": f"{category_name} editada com sucesso."},
@@ -153,22 +143,25 @@ class CategoryView(SCView):
             category.deletion_date = timezone.now()
             category.save()
 
-            active_categories = SnackCategory.objects.filter(
-                deletion_date__isnull=True
-            ).all()
+            # Os itens da categoria também são excluídos, liberando os seus nomes.
+            category.snacks.filter(deletion_date__isnull=True).update(
+                deletion_date=category.deletion_date
+            )
 
-            for index, category in enumerate(active_categories):
-                category.position_order = index + 1
-                category.save()
+            changed = SnackCategory.objects.renumber()
 
         # Notifica todos os clientes websocket sobre a exclusão da categoria no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        catalog_snapshot.publish_on_commit(
+            [change("delete", "category", category_name)]
+            + [position_change(category) for category in changed]
+        )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class SnackView(SCView):
     permission_classes = [SCAuthenticationHttp]
+    default_access = EMPLOYEE
 
     def dispatch(self, request, *args, **kwargs):
         """Verifica se a categoria e o item existe antes de acessar os endpoints."""
@@ -176,21 +169,13 @@ class SnackView(SCView):
         category_name = kwargs.get("category_name")
         snack_name = kwargs.get("snack_name")
 
-        query_category = get_object_or_404(
-            SnackCategory, name=category_name, deletion_date__isnull=True
-        )
-        query_snack = get_object_or_404(
-            Snack, name=snack_name, category=query_category, deletion_date__isnull=True
+        query_snack = snack_resolver.resolve_or_404(
+            category_name, snack_name, for_write=request.method not in SAFE_METHODS
         )
         kwargs["snack"] = query_snack
 
         return super().dispatch(request, *args, **kwargs)
 
-    def validate_before_access(self, user: User, _) -> bool:
-        """Verifica se o usuário tem autorização para acessar qualquer endpoint."""
-
-        return user.is_employee
-
     def get(self, _, category_name, snack_name, snack):
         """Retorna os dados do lanche."""
 
@@ -211,7 +196,10 @@ class SnackView(SCView):
         serializer.save()
 
         # Notifica todos os clientes websocket sobre a edição do lanche no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        # O estoque, alterado também pelos pedidos, é lido novamente na publicação.
+        catalog_snapshot.publish_on_commit(
+            lambda: [snack_change(snack, snack_name), *stock_changes([snack.pk])]
+        )
 
         return Response(
             {
@@ -224,9 +212,9 @@ class SnackView(SCView):
         """Marca o item como excluído."""
 
         snack.deletion_date = timezone.now()
-        snack.save()
+        snack.save(update_fields=["deletion_date"])
 
         # Notifica todos os clientes websocket sobre a exclusão do lanche no estoque de lanches.
-        dispatch_message_websocket("snacks_group", "snacks_update")
+        catalog_snapshot.publish_on_commit([change("delete", "snack", snack_name)])
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.user'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from core.principal import invalidate_principal
+
+        # Os usuários em cache são descartados ao alterar a função ou desativar o usuário.
+        post_save.connect(invalidate_principal, sender=self.get_model("User"))
+        post_delete.connect(invalidate_principal, sender=self.get_model("User"))
@@ -20,7 +20,7 @@ class UserManager(BaseUserManager):
 class User(AbstractBaseUser, PermissionsMixin):
     id = models.BigAutoField(primary_key=True)
     username = models.CharField(max_length=100, unique=True)
-    email = models.EmailField(max_length=100)
+    email = models.EmailField(max_length=100, db_index=True)
     is_active = models.BooleanField(default=True)
 
     # ADM do sistema.
@@ -1,5 +1,6 @@
 from django.core.validators import validate_email
 from core.serializers import SCSerializer
+from core.hashing import password_hashing
 from django.db import transaction
 
 from rest_framework.exceptions import PermissionDenied
@@ -71,12 +72,14 @@ class UserSerializer(SCSerializer):
 
     def create(self, validated_data):
         """Cria o usuário e sua tabela de detalhes."""
+
+        # O hash da senha é calculado no pool de hashing, antes de abrir a transação.
+        password = password_hashing.make_password(validated_data.pop("password"))
+
         with transaction.atomic():
             userDetails = validated_data.pop("user_details")
-            password = validated_data.pop("password")
 
-            user = User(**validated_data)
-            user.set_password(password)
+            user = User(**validated_data, password=password)
             user.save()
 
             details = UserDetailsSerializer(data=userDetails)
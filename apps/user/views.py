@@ -1,13 +1,14 @@
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
+from core.throttling import SCSlidingWindowThrottle
+
 from .serializers import UserSerializer
 
 
 class RegisterView(APIView):
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SCSlidingWindowThrottle]
     throttle_scope = "limited_access"
 
     def post(self, request):
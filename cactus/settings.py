@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -40,6 +41,11 @@ REST_FRAMEWORK = {
     },
 }
 
+# Banco de dados SQLite dos limites de acesso, compartilhado entre os workers (ver `core.throttling`).
+THROTTLE_DATABASE = os.getenv(
+    "THROTTLE_DATABASE", os.path.join(tempfile.gettempdir(), "cactus-throttle.sqlite3")
+)
+
 SIMPLE_JWT = {
     "AUTH_COOKIE": "access_token",
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
@@ -49,6 +55,24 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_SAMESITE": "Lax",  # Strict to prod.
 }
 
+# Capacidade inicial do filtro de Bloom dos tokens revogados (ver `apps.session.blacklist`).
+TOKEN_BLACKLIST_FILTER_CAPACITY = int(
+    os.getenv("TOKEN_BLACKLIST_FILTER_CAPACITY", 100_000)
+)
+# Intervalo (em segundos) entre as sincronizações do filtro com as revogações dos outros processos.
+TOKEN_BLACKLIST_SYNC_INTERVAL = float(os.getenv("TOKEN_BLACKLIST_SYNC_INTERVAL", 5))
+
+# Tempo de vida (em segundos) e tamanho do cache dos usuários autenticados por token.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+
+# Threads, tamanho da fila e tempo limite (em segundos) do pool de hashing de senhas.
+PASSWORD_HASHING_WORKERS = int(
+    os.getenv("PASSWORD_HASHING_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+PASSWORD_HASHING_QUEUE = int(os.getenv("PASSWORD_HASHING_QUEUE", 64))
+PASSWORD_HASHING_TIMEOUT = float(os.getenv("PASSWORD_HASHING_TIMEOUT", 10))
+
 
 # Application definition
 INSTALLED_APPS = [
@@ -63,10 +87,12 @@ INSTALLED_APPS = [
     "corsheaders",
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
+    "core",
     "apps.user",
     "apps.session",
     "apps.snack",
     "apps.lunch",
+    "apps.order",
 ]
 
 
@@ -120,6 +146,12 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Janela (em segundos) para agrupar as mensagens websocket enviadas a um mesmo grupo.
+WEBSOCKET_DISPATCH_WINDOW = float(os.getenv("WEBSOCKET_DISPATCH_WINDOW", 0.15))
+
+# Intervalo (em segundos) entre as verificações da versão compartilhada dos snapshots.
+SNAPSHOT_SYNC_INTERVAL = float(os.getenv("SNAPSHOT_SYNC_INTERVAL", 1))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -3,6 +3,7 @@ from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework_simplejwt.tokens import AccessToken
 from django.conf import settings
 
+from .principal import principal_cache
 from .view import SCView
 from apps.user.models import User
 
@@ -21,26 +22,33 @@ class SCAuthenticationHttp(JWTAuthentication):
             raise AuthenticationFailed("O token não foi encontrado.")
 
         try:
-            validated_token = AccessToken(token)
-            return self.get_user(validated_token), validated_token
+            return principal_cache.authenticate(token)
 
         except:
             raise AuthenticationFailed("O token é inválido ou expirou.")
 
     def has_permission(self, request, view):
-        """Retorna se o usuário possui permição para acessar o método da view."""
+        """Retorna se o usuário possui permição para acessar o método da view.
 
-        method = request.method.lower()
+        A política do método é obtida das políticas compiladas da view (ver `SCView.access`).
+        Métodos públicos não realizam a autenticação, evitando a verificação do token.
+        """
 
-        # Verifica se a view atual herda `SCView` para execução do método de validação de acesso.
-        if (
-            issubclass(view.__class__, SCView)
-            and method not in view.ignore_validation_for_methods
-        ):
-            # Verifica se o usuário está autenticado.
-            user, _ = self.authenticate(request)
+        # Apenas views que herdem `SCView` possuem políticas de acesso.
+        if not isinstance(view, SCView):
+            return True
 
-            if not view.validate_before_access(user, method):
-                raise PermissionDenied("Usuário não autorizado.")
+        policy = view.get_access_policy(request.method)
+        if not policy.requires_authentication:
+            return True
+
+        # Verifica se o usuário está autenticado.
+        user, _ = self.authenticate(request)
+
+        if not policy.check(user):
+            raise PermissionDenied("Usuário não autorizado.")
+
+        # Disponibiliza o usuário autenticado para a view, evitando uma nova autenticação.
+        request.user = user
 
         return True
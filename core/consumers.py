@@ -1,9 +1,12 @@
-from rest_framework_simplejwt.tokens import AccessToken
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
+from urllib.parse import parse_qs
 
 from apps.user.models import User
 
+from .principal import principal_cache
+from .snapshot import SCSnapshot
+
 
 class SCWebsocketConsumer(AsyncJsonWebsocketConsumer):
     async def get_user(self) -> User | None:
@@ -12,13 +15,41 @@ class SCWebsocketConsumer(AsyncJsonWebsocketConsumer):
 
         if access_token:
             try:
-                decoded_token = AccessToken(access_token)
-                return await self.get_user_by_id(decoded_token["user_id"])
+                # Usuários em cache são obtidos sem acessar o banco de dados.
+                principal = principal_cache.get(access_token)
+                if principal is None:
+                    principal = await database_sync_to_async(
+                        principal_cache.authenticate
+                    )(access_token)
+
+                return principal[0]
             except:
                 await self.close(code=4001, reason="O token é inválido ou expirou.")
 
         return None
 
-    @database_sync_to_async
-    def get_user_by_id(self, user_id):
-        return User.objects.filter(id=user_id).first()
+    def get_client_version(self, content: dict | None = None) -> int | None:
+        """Obtém a última versão recebida pelo cliente.
+
+        A versão pode ser informada na conexão (`?version=N`) ou em uma mensagem
+        (`{"version": N}`). Retorna None caso não seja informada ou seja inválida.
+        """
+
+        if content is None:
+            query = parse_qs(self.scope.get("query_string", b"").decode())
+            version = query.get("version", [None])[0]
+        else:
+            version = content.get("version") if isinstance(content, dict) else None
+
+        try:
+            return int(version)
+        except (TypeError, ValueError):
+            return None
+
+    async def send_snapshot(self, snapshot: SCSnapshot, version: int | None = None):
+        """Envia ao cliente os quadros necessários para atualizá-lo a partir da sua versão."""
+
+        frames = await database_sync_to_async(snapshot.get_frames_since)(version)
+
+        for frame in frames:
+            await self.send(text_data=frame)
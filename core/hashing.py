@@ -0,0 +1,129 @@
+from rest_framework.exceptions import APIException
+from django.contrib.auth.hashers import check_password, make_password
+from django.conf import settings
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from threading import BoundedSemaphore, Lock
+import asyncio
+import os
+
+from apps.user.models import User
+
+
+class HashingUnavailable(APIException):
+    status_code = 503
+    default_detail = (
+        "O serviço de autenticação está sobrecarregado. Tente novamente em instantes."
+    )
+    default_code = "hashing_unavailable"
+
+
+class SCPasswordHashingPool:
+    """Pool de tamanho limitado para o cálculo dos hashes de senha (PBKDF2).
+
+    O cálculo é intencionalmente custoso e, executado na thread da requisição, ocupa as
+    threads que atendem as demais views (ex.: catálogo) durante picos de login. As tarefas
+    são executadas em `PASSWORD_HASHING_WORKERS` threads dedicadas (o PBKDF2 do `hashlib`
+    libera o GIL, permitindo o cálculo em paralelo) com uma fila de até
+    `PASSWORD_HASHING_QUEUE` tarefas. Quando a fila está cheia ou a tarefa não é concluída
+    em `PASSWORD_HASHING_TIMEOUT` segundos, a requisição é recusada com `HashingUnavailable`.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots: BoundedSemaphore | None = None
+
+    @property
+    def workers(self) -> int:
+        default = max(1, (os.cpu_count() or 2) // 2)
+        return getattr(settings, "PASSWORD_HASHING_WORKERS", default)
+
+    @property
+    def queue_size(self) -> int:
+        return getattr(settings, "PASSWORD_HASHING_QUEUE", 64)
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, "PASSWORD_HASHING_TIMEOUT", 10)
+
+    def submit(self, function, *args) -> Future:
+        """Agenda a tarefa no pool.
+
+        Raises:
+            HashingUnavailable: Se a fila do pool estiver cheia.
+        """
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hashing"
+                )
+                self._slots = BoundedSemaphore(self.workers + self.queue_size)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailable()
+
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+
+        return future
+
+    def run(self, function, *args):
+        """Executa a tarefa no pool, bloqueando a thread atual até a sua conclusão."""
+
+        future = self.submit(function, *args)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A tarefa ainda na fila não é executada.
+            future.cancel()
+            raise HashingUnavailable()
+
+    async def arun(self, function, *args):
+        """Executa a tarefa no pool sem ocupar uma thread enquanto aguarda a conclusão."""
+
+        future = self.submit(function, *args)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise HashingUnavailable()
+
+    def make_password(self, password: str) -> str:
+        return self.run(make_password, password)
+
+    async def acheck_password(self, user: User | None, password: str) -> bool:
+        """Verifica a senha do usuário, atualizando o hash caso esteja desatualizado.
+
+        Caso o usuário não exista, um hash é calculado mesmo assim, mantendo o tempo de
+        resposta semelhante ao de um usuário existente.
+        """
+
+        if user is None:
+            await self.arun(make_password, password)
+            return False
+
+        valid, encoded = await self.arun(verify_password, password, user.password)
+        if encoded:
+            user.password = encoded
+            await user.asave(update_fields=["password"])
+
+        return valid
+
+
+def verify_password(password: str, encoded: str) -> tuple[bool, str | None]:
+    """Retorna se a senha é válida e, caso o hash precise ser atualizado, o novo hash.
+
+    A atualização do usuário é feita por quem solicitou a verificação, evitando acessos
+    ao banco de dados nas threads do pool.
+    """
+
+    # O `setter` é chamado apenas para senhas válidas cujo hash está desatualizado.
+    outdated = []
+    valid = check_password(password, encoded, setter=outdated.append)
+
+    return valid, make_password(password) if outdated else None
+
+
+password_hashing = SCPasswordHashingPool()
@@ -0,0 +1,49 @@
+from django.db import models, transaction
+from django.db.models import F
+import time
+
+
+class SnapshotVersionQuerySet(models.QuerySet):
+    def current(self, name: str) -> int:
+        """Retorna a versão atual de um snapshot, criando-a caso não exista.
+
+        A versão inicial é baseada no horário de criação (em milissegundos), para que
+        versões obtidas pelos clientes antes da criação do registro não sejam confundidas
+        com as atuais.
+        """
+
+        version = self.filter(name=name).values_list("version", flat=True).first()
+
+        if version is None:
+            snapshot_version, _ = self.get_or_create(
+                name=name, defaults={"version": time.time_ns() // 1_000_000}
+            )
+            version = snapshot_version.version
+
+        return version
+
+    def advance(self, name: str) -> int:
+        """Incrementa a versão de um snapshot de forma atômica e retorna a nova versão."""
+
+        with transaction.atomic():
+            if not self.filter(name=name).update(version=F("version") + 1):
+                self.current(name)
+                self.filter(name=name).update(version=F("version") + 1)
+
+            # A linha permanece bloqueada pela atualização até o fim da transação.
+            return self.filter(name=name).values_list("version", flat=True).get()
+
+
+class SnapshotVersion(models.Model):
+    """Versão de um snapshot (ver `core.snapshot`), compartilhada entre os workers."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField()
+
+    objects = SnapshotVersionQuerySet.as_manager()
+
+    class Meta:
+        db_table = "Snapshot_version"
+
+    def __str__(self):
+        return f"{self.name} - {self.version}"
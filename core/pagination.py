@@ -0,0 +1,87 @@
+from rest_framework.exceptions import ValidationError
+from django.db.models import QuerySet, Q
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+
+
+class SCKeysetPagination:
+    """Paginação por cursor (keyset) em ordem decrescente de um campo de data e do `id`.
+
+    Cada página é obtida com um filtro `(data, id) < (última data, último id)`, limitado
+    por `data <= última data`, sobre um índice composto com a mesma ordenação, de modo que o custo de qualquer página é
+    equivalente ao da primeira. O cursor é opaco para o cliente e, por referenciar o
+    último registro enviado, não é afetado por inserções concorrentes.
+    """
+
+    def __init__(self, date_field: str, default_limit: int = 50, max_limit: int = 100):
+        self.date_field = date_field
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def paginate(
+        self, queryset: QuerySet, cursor: str | None = None, limit: str | None = None
+    ) -> tuple[list, str | None]:
+        """Retorna os registros da página e o cursor da próxima página (None na última).
+
+        Raises:
+            ValidationError: Se o cursor ou o limite forem inválidos.
+        """
+
+        limit = self.get_limit(limit)
+        queryset = queryset.order_by(f"-{self.date_field}", "-id")
+
+        if cursor:
+            date, pk = self.decode_cursor(cursor)
+            # O limite `data <= última data`, redundante com a disjunção, permite que o banco
+            # de dados percorra apenas o intervalo do índice a partir do cursor.
+            queryset = queryset.filter(
+                Q(**{f"{self.date_field}__lt": date})
+                | Q(**{self.date_field: date, "id__lt": pk}),
+                **{f"{self.date_field}__lte": date},
+            )
+
+        # Um registro adicional é obtido para identificar se existe uma próxima página.
+        items = list(queryset[: limit + 1])
+
+        if len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        return items, self.encode_cursor(items[-1])
+
+    def get_limit(self, limit: str | None) -> int:
+        if limit is None:
+            return self.default_limit
+
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValidationError("O limite informado não é válido.")
+
+        if not 1 <= limit <= self.max_limit:
+            raise ValidationError(
+                f"O limite deve estar entre 1 e {self.max_limit} registros."
+            )
+
+        return limit
+
+    def encode_cursor(self, instance) -> str:
+        date = getattr(instance, self.date_field)
+        data = json.dumps([date.isoformat(), instance.pk]).encode()
+
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str):
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            date, pk = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            date = parse_datetime(date)
+
+            if date is None or not isinstance(pk, int):
+                raise ValueError
+
+        except (TypeError, ValueError):
+            raise ValidationError("O cursor informado não é válido.")
+
+        return date, pk
@@ -0,0 +1,136 @@
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from django.conf import settings
+from collections import OrderedDict
+from threading import Lock
+import time
+
+from apps.user.models import User
+
+
+class SCPrincipalCache:
+    """Cache LRU em memória, com tempo de vida limitado, dos usuários autenticados por token.
+
+    A cada token de acesso válido são associados o token já verificado (assinatura e validade)
+    e um registro reduzido do usuário (`principal_fields`), evitando a verificação e a consulta
+    ao banco de dados em cada requisição. O usuário é entregue como uma instância de `User`
+    com os demais campos adiados, carregados apenas se acessados.
+
+    As entradas expiram após `PRINCIPAL_CACHE_TTL` segundos (ou na expiração do token) e são
+    descartadas quando o usuário é alterado (ex.: desativação ou mudança de função).
+    """
+
+    principal_fields = ["id", "username", "is_active", "is_employee"]
+
+    def __init__(self):
+        self._lock = Lock()
+        self._entries: OrderedDict[str, tuple[float, AccessToken, tuple]] = (
+            OrderedDict()
+        )
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+        # Os campos são ordenados como no modelo, conforme exigido por `Model.from_db`.
+        self._field_names = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in self.principal_fields
+        ]
+
+    @property
+    def ttl(self) -> float:
+        return getattr(settings, "PRINCIPAL_CACHE_TTL", 60)
+
+    @property
+    def maxsize(self) -> int:
+        return getattr(settings, "PRINCIPAL_CACHE_SIZE", 1024)
+
+    def get(self, raw_token: str) -> tuple[User, AccessToken] | None:
+        """Retorna o usuário e o token armazenados, sem acessar o banco de dados."""
+
+        with self._lock:
+            entry = self._entries.get(raw_token)
+
+            if entry is None:
+                return None
+
+            if entry[0] <= time.time():
+                self._discard(raw_token)
+                return None
+
+            self._entries.move_to_end(raw_token)
+
+        _, token, values = entry
+        return User.from_db("default", self._field_names, values), token
+
+    def authenticate(self, raw_token: str) -> tuple[User, AccessToken]:
+        """Retorna o usuário e o token, verificando-os caso não estejam armazenados.
+
+        Raises:
+            TokenError: Se o token for inválido ou estiver expirado.
+            InvalidToken: Se o usuário não existir ou estiver desativado.
+        """
+
+        principal = self.get(raw_token)
+        if principal is not None:
+            return principal
+
+        token = AccessToken(raw_token)
+        values = (
+            User.objects.filter(
+                **{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]},
+                is_active=True,
+            )
+            .values_list(*self._field_names)
+            .first()
+        )
+
+        if values is None:
+            raise InvalidToken("O usuário não foi encontrado ou está inativo.")
+
+        expires_at = min(time.time() + self.ttl, token["exp"])
+        user_id = values[self._field_names.index("id")]
+
+        with self._lock:
+            self._entries[raw_token] = (expires_at, token, values)
+            self._entries.move_to_end(raw_token)
+            self._tokens_by_user.setdefault(user_id, set()).add(raw_token)
+
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+        return User.from_db("default", self._field_names, values), token
+
+    def invalidate_user(self, user_id: int):
+        """Descarta todas as entradas de um usuário."""
+
+        with self._lock:
+            for raw_token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(raw_token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _discard(self, raw_token: str):
+        entry = self._entries.pop(raw_token, None)
+        if entry is None:
+            return
+
+        user_id = entry[2][self._field_names.index("id")]
+        tokens = self._tokens_by_user.get(user_id)
+
+        if tokens is not None:
+            tokens.discard(raw_token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = SCPrincipalCache()
+
+
+def invalidate_principal(sender, instance: User, **kwargs):
+    """Descarta os usuários armazenados após a alteração ou exclusão do usuário."""
+
+    principal_cache.invalidate_user(instance.pk)
@@ -0,0 +1,75 @@
+from django.http import Http404
+from django.db.models import Model
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+import copy
+
+from .snapshot import SCSnapshot
+
+
+class SCResolver:
+    """Cache LRU em memória que resolve nomes (utilizados nas URLs) para instâncias de um modelo.
+
+    Cada entrada é associada à versão do snapshot do recurso no momento da consulta.
+    Como todas as escritas do recurso publicam o snapshot, qualquer alteração invalida
+    as entradas anteriores, sem a necessidade de invalidações específicas por nome. A
+    versão é a compartilhada entre os workers, verificada no máximo uma vez por intervalo
+    (ver `SCSnapshot.sync`), de modo que as leituras em cache não acessam o banco de dados
+    e as alterações realizadas em outros workers também invalidam as entradas.
+
+    As instâncias são retornadas como cópias. Nas escritas (`for_write=True`), a instância
+    é sempre obtida do banco de dados, evitando salvar dados anteriores à última alteração.
+    """
+
+    def __init__(
+        self,
+        snapshot: SCSnapshot,
+        loader: Callable[..., Model | None],
+        maxsize: int = 256,
+    ):
+        self.snapshot = snapshot
+        self.loader = loader
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._entries: OrderedDict[tuple, tuple[int, Model | None]] = OrderedDict()
+
+    def resolve(self, *key, for_write: bool = False) -> Model | None:
+        """Retorna a instância correspondente à chave ou None caso não exista."""
+
+        if for_write:
+            return self.loader(*key)
+
+        version = self.snapshot.sync()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+
+        instance = self.loader(*key)
+
+        with self._lock:
+            self._entries[key] = (version, instance)
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return copy.deepcopy(instance)
+
+    def resolve_or_404(self, *key, for_write: bool = False) -> Model:
+        """Retorna a instância correspondente à chave.
+
+        Raises:
+            Http404: Se a instância não existir.
+        """
+
+        instance = self.resolve(*key, for_write=for_write)
+
+        if instance is None:
+            raise Http404
+
+        return instance
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
 
 
 class SCSerializer(serializers.ModelSerializer):
@@ -19,6 +20,35 @@ class SCSerializer(serializers.ModelSerializer):
             key: getattr(self, f"representation_for_{key}", None) for key in self.fields
         }
 
+    def save(self, **kwargs):
+        """Salva a instância, convertendo violações de restrições do banco de dados em erros de validação.
+
+        Caso a escrita viole uma restrição (ex.: nome único), os métodos
+        `integrity_error_for_<campo>` são consultados para identificar o campo em conflito
+        e retornar a mensagem de erro. Se nenhum campo for identificado, o erro original é mantido.
+        """
+
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+
+        except IntegrityError:
+            errors = {}
+
+            for key, value in self.validated_data.items():
+                function = getattr(self, f"integrity_error_for_{key}", None)
+
+                if function and callable(function):
+                    message = function(value)
+
+                    if message:
+                        errors[key] = [message]
+
+            if errors:
+                raise serializers.ValidationError(errors)
+
+            raise
+
     def to_internal_value(self, data):
         data_copy = data.copy()
 
@@ -0,0 +1,319 @@
+from rest_framework.renderers import JSONRenderer
+from django.db import transaction
+from django.conf import settings
+from collections import deque
+from threading import RLock
+from typing import Any, Callable
+import time
+
+from utils.message import dispatch_message_websocket
+
+from .models import SnapshotVersion
+
+
+def change(
+    op: str, entity: str, key: str | list[str], data: dict | None = None
+) -> dict:
+    """Cria o registro de uma alteração (delta) de uma entidade de um snapshot.
+
+    Args:
+        op (str): A operação realizada (`upsert` ou `delete`). No `upsert`, os campos
+            informados em `data` são criados ou substituídos na entidade.
+        entity (str): O tipo da entidade alterada (ex.: 'snack', 'category').
+        key (str | list[str]): O identificador da entidade antes da alteração (ex.: o nome anterior).
+        data (dict, optional): Os campos atuais da entidade. Ignorado na operação `delete`.
+
+    Returns:
+        dict: O registro da alteração.
+    """
+
+    record = {"op": op, "entity": entity, "key": key}
+
+    if op != "delete":
+        record["data"] = data
+
+    return record
+
+
+class SCSnapshot:
+    """Snapshot versionado e pré-calculado de um recurso do sistema Cactus.
+
+    O snapshot mantém em memória o resultado serializado de `build` e um número de
+    versão monotonicamente crescente, armazenado no banco de dados (`SnapshotVersion`) e
+    compartilhado entre os workers. A versão compartilhada é verificada (uma consulta pela
+    chave primária) no máximo a cada `SNAPSHOT_SYNC_INTERVAL` segundos, e o estado só é
+    reconstruído quando ela muda, inclusive por publicações realizadas em outros workers.
+    As leituras dentro do intervalo são respondidas da memória, sem acesso ao banco de
+    dados; as publicações do próprio worker são visíveis imediatamente.
+
+    Quando `group_name` e `type_message` são definidos, `publish` envia as alterações,
+    já codificadas, ao grupo websocket. Os clientes recebem quadros (frames) no formato:
+
+        {"type": "snapshot", "version": N, "data": ...}
+        {"type": "delta", "version": N, "changes": [...]}
+
+    Os últimos deltas são mantidos em um registro limitado (`change_log_size`), permitindo
+    que um cliente reconectado receba apenas as alterações a partir da sua última versão.
+    Quadros com versão menor ou igual à versão do cliente devem ser ignorados por ele.
+    As alterações publicadas por outros workers não são descritas localmente, de modo que
+    o registro é descartado e esses clientes recebem o snapshot completo.
+
+    O envio ao grupo é agrupado pelo `dispatch_message_websocket`: as alterações publicadas
+    dentro da mesma janela são enviadas em um único delta, com a versão mais recente.
+
+    Nota: Os dados retornados são compartilhados entre as requisições e não devem ser alterados.
+    """
+
+    name: str
+    group_name: str | None = None
+    type_message: str | None = None
+    change_log_size: int = 256
+
+    def __init__(self):
+        self._lock = RLock()
+        self._version: int | None = None
+        self._data = None
+        self._frame = None
+        self._rendered: dict[str | None, bytes] = {}
+        self._sent_version: int | None = None
+        self._synced_at = 0.0
+        self._changes: deque[tuple[int, list[dict], str]] = deque(
+            maxlen=self.change_log_size
+        )
+
+    @property
+    def version(self) -> int | None:
+        """A última versão conhecida por este worker (ver `sync`)."""
+
+        return self._version
+
+    @property
+    def sync_interval(self) -> float:
+        return getattr(settings, "SNAPSHOT_SYNC_INTERVAL", 1)
+
+    def sync(self, force: bool = False) -> int:
+        """Obtém a versão compartilhada, descartando os dados locais caso ela tenha mudado.
+
+        Args:
+            force (bool, optional): Verifica a versão mesmo antes do fim do intervalo.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._version is not None
+                and now - self._synced_at < self.sync_interval
+            ):
+                return self._version
+
+            self._synced_at = now
+
+        version = SnapshotVersion.objects.current(self.name)
+
+        with self._lock:
+            if self._version is None or version > self._version:
+                if self._sent_version is None:
+                    self._sent_version = version
+
+                # As alterações de outros workers não estão no registro local.
+                self._changes.clear()
+                self._set_version(version)
+
+            return self._version
+
+    def build(self) -> Any:
+        """Obtém o estado atual do recurso. Deve ser implementado pelas subclasses."""
+
+        raise NotImplementedError
+
+    def get(self) -> tuple[int, Any]:
+        """Retorna a versão e os dados do snapshot, reconstruindo-os caso necessário."""
+
+        self.sync()
+        return self._get()
+
+    def _get(self) -> tuple[int, Any]:
+        with self._lock:
+            if self._data is None:
+                self._data = self.build()
+
+            return self._version, self._data
+
+    def select(self, data, part: str | None) -> Any:
+        """Retorna uma parte dos dados do snapshot. Pode ser sobrescrito pelas subclasses.
+
+        Raises:
+            KeyError: Se a parte solicitada não existir.
+        """
+
+        if part is not None:
+            raise KeyError(part)
+
+        return data
+
+    def check(self, part: str) -> int:
+        """Verifica se uma parte existe no snapshot, sem renderizá-la, e retorna a versão.
+
+        Raises:
+            KeyError: Se a parte solicitada não existir.
+        """
+
+        with self._lock:
+            version, data = self._get()
+
+            if part not in self._rendered:
+                self.select(data, part)
+
+            return version
+
+    def get_rendered(self, part: str | None = None) -> tuple[int, bytes]:
+        """Retorna a versão e uma parte do snapshot renderizada em JSON (ver `select`).
+
+        O conteúdo é renderizado uma única vez por versão, de modo que as leituras
+        seguintes são respondidas da memória (ver `sync`).
+
+        Raises:
+            KeyError: Se a parte solicitada não existir.
+        """
+
+        self.sync()
+
+        with self._lock:
+            version, data = self._get()
+
+            if part not in self._rendered:
+                self._rendered[part] = JSONRenderer().render(self.select(data, part))
+
+            return version, self._rendered[part]
+
+    def get_frame(self) -> str:
+        """Retorna o quadro com o snapshot completo da versão local, codificado uma única vez."""
+
+        with self._lock:
+            version, data = self._get()
+
+            if self._frame is None:
+                self._frame = self.encode(
+                    {"type": "snapshot", "version": version, "data": data}
+                )
+
+            return self._frame
+
+    def get_frames_since(self, version: int | None) -> list[str]:
+        """Retorna os quadros necessários para atualizar um cliente a partir da sua versão.
+
+        Caso a versão não seja informada ou as alterações não estejam mais disponíveis
+        no registro, retorna apenas o snapshot completo.
+        """
+
+        self.sync()
+
+        with self._lock:
+            if version == self._version:
+                return []
+
+            if (
+                version is not None
+                and self._changes
+                and self._changes[0][0] - 1 <= version < self._version
+            ):
+                return [frame for number, _, frame in self._changes if number > version]
+
+            return [self.get_frame()]
+
+    def invalidate(self):
+        """Descarta os dados atuais e incrementa a versão do snapshot.
+
+        Deve ser chamado após a confirmação (commit) da escrita, para que a próxima
+        leitura não reconstrua o snapshot com dados anteriores à alteração. Como a
+        alteração não é descrita, o registro de deltas é descartado.
+        """
+
+        with self._lock:
+            self._advance()
+            self._changes.clear()
+
+    def publish(self, changes: list[dict] | Callable[[], list[dict]] | None = None):
+        """Invalida o snapshot e envia as alterações, já codificadas, ao grupo websocket.
+
+        Args:
+            changes (list[dict] | Callable, optional): As alterações realizadas (ver
+                `change`), ou uma função que as cria. A função é chamada com a nova versão
+                ainda bloqueada, de modo que os dados lidos nela (ex.: o estoque atual)
+                seguem a ordem das versões entre publicações concorrentes. Caso não sejam
+                informadas, o snapshot completo é enviado.
+        """
+
+        with self._lock:
+            if changes is None:
+                self.invalidate()
+
+            else:
+                with transaction.atomic():
+                    version = self._advance()
+
+                    if callable(changes):
+                        changes = changes()
+
+                frame = self.encode(
+                    {"type": "delta", "version": version, "changes": changes}
+                )
+                self._changes.append((version, changes, frame))
+
+        # O quadro é gerado apenas no envio, reunindo todas as alterações ainda não enviadas.
+        dispatch_message_websocket(
+            self.group_name, self.type_message, self._render_pending
+        )
+
+    def publish_on_commit(
+        self, changes: list[dict] | Callable[[], list[dict]] | None = None
+    ):
+        """Agenda a publicação das alterações para após a confirmação da transação atual."""
+
+        transaction.on_commit(lambda: self.publish(changes))
+
+    def _render_pending(self) -> str | None:
+        """Gera o quadro com as alterações publicadas desde o último envio ao grupo."""
+
+        with self._lock:
+            if self._sent_version == self._version:
+                return None
+
+            previous_version, self._sent_version = self._sent_version, self._version
+            pending = [entry for entry in self._changes if entry[0] > previous_version]
+
+            # Sem o registro completo das alterações, envia o snapshot completo.
+            if not pending or pending[0][0] != previous_version + 1:
+                return self.get_frame()
+
+            if len(pending) == 1:
+                return pending[0][2]
+
+            changes = [record for _, records, _ in pending for record in records]
+            return self.encode(
+                {"type": "delta", "version": self._version, "changes": changes}
+            )
+
+    def _advance(self) -> int:
+        version = SnapshotVersion.objects.advance(self.name)
+
+        # Versões intermediárias foram publicadas por outros workers.
+        if self._version is None or version != self._version + 1:
+            self._changes.clear()
+
+        if self._sent_version is None:
+            self._sent_version = version - 1
+
+        self._set_version(version)
+        return version
+
+    def _set_version(self, version: int):
+        self._version = version
+        self._data = None
+        self._frame = None
+        self._rendered = {}
+
+    @staticmethod
+    def encode(data) -> str:
+        return JSONRenderer().render(data).decode()
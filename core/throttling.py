@@ -0,0 +1,175 @@
+from rest_framework.throttling import ScopedRateThrottle
+from django.conf import settings
+from threading import local
+import logging
+import sqlite3
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class SCThrottleStore:
+    """Armazenamento dos contadores de acesso compartilhado entre os processos (SQLite).
+
+    Cada chave possui apenas a janela atual e os contadores da janela atual e da anterior,
+    de modo que cada verificação é uma leitura e uma escrita de uma única linha. As
+    verificações são serializadas entre os processos por transações `BEGIN IMMEDIATE`.
+    Os acessos recusados são contabilizados por escopo na tabela `throttle_rejected`.
+    """
+
+    # Quantidade de verificações, por processo, entre as remoções das chaves expiradas.
+    prune_interval = 1000
+
+    def __init__(self):
+        self._local = local()
+        self._checks = 0
+
+    @property
+    def path(self) -> str:
+        return str(settings.THROTTLE_DATABASE)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # As conexões são por thread e recriadas nos processos filhos (ex.: após um fork).
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle ("
+                "key TEXT PRIMARY KEY, window INTEGER NOT NULL, current INTEGER NOT NULL, "
+                "previous INTEGER NOT NULL, expires REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_rejected ("
+                "scope TEXT PRIMARY KEY, rejected INTEGER NOT NULL)"
+            )
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def hit(
+        self, key: str, scope: str, limit: int, duration: int, now: float
+    ) -> tuple[bool, float]:
+        """Registra um acesso se estiver dentro do limite (janela deslizante).
+
+        A quantidade de acessos nos últimos `duration` segundos é estimada pela soma dos
+        acessos da janela atual com os da janela anterior, ponderados pela fração da
+        janela anterior ainda coberta.
+
+        Returns:
+            tuple[bool, float]: Se o acesso foi permitido e, caso contrário, os segundos
+            estimados até o próximo acesso permitido.
+        """
+
+        window = int(now // duration)
+        progress = (now - window * duration) / duration
+        connection = self.connection
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT window, current, previous FROM throttle WHERE key = ?", (key,)
+            ).fetchone()
+
+            current, previous = 0, 0
+            if row is not None and row[0] == window:
+                current, previous = row[1], row[2]
+            elif row is not None and row[0] == window - 1:
+                previous = row[1]
+
+            if previous * (1 - progress) + current + 1 > limit:
+                connection.execute(
+                    "INSERT INTO throttle_rejected (scope, rejected) VALUES (?, 1) "
+                    "ON CONFLICT (scope) DO UPDATE SET rejected = rejected + 1",
+                    (scope,),
+                )
+                connection.execute("COMMIT")
+
+                return False, self.wait(limit, duration, progress, current, previous)
+
+            connection.execute(
+                "INSERT INTO throttle (key, window, current, previous, expires) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "window = excluded.window, current = excluded.current, "
+                "previous = excluded.previous, expires = excluded.expires",
+                (key, window, current + 1, previous, (window + 2) * duration),
+            )
+            connection.execute("COMMIT")
+
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._checks += 1
+        if self._checks % self.prune_interval == 0:
+            self.prune(now)
+
+        return True, 0.0
+
+    @staticmethod
+    def wait(
+        limit: int, duration: int, progress: float, current: int, previous: int
+    ) -> float:
+        """Estima os segundos até que o peso da janela anterior permita um novo acesso."""
+
+        if current + 1 > limit or not previous:
+            # É necessário aguardar a próxima janela.
+            return (1 - progress) * duration
+
+        wait = (1 - (limit - 1 - current) / previous - progress) * duration
+        return min(max(0.0, wait), (1 - progress) * duration)
+
+    def prune(self, now: float):
+        """Remove as chaves sem acessos na janela atual e na anterior."""
+
+        self.connection.execute("DELETE FROM throttle WHERE expires <= ?", (now,))
+
+    def rejected(self) -> dict[str, int]:
+        """Retorna a quantidade de acessos recusados por escopo, somando todos os processos."""
+
+        return dict(
+            self.connection.execute("SELECT scope, rejected FROM throttle_rejected")
+        )
+
+
+throttle_store = SCThrottleStore()
+
+
+class SCSlidingWindowThrottle(ScopedRateThrottle):
+    """Limite de acessos por escopo (`throttle_scope`) com janela deslizante.
+
+    Substitui o histórico de acessos do `ScopedRateThrottle`, armazenado no cache local de
+    cada processo, por contadores compartilhados entre os processos (`SCThrottleStore`),
+    mantendo o limite configurado independente da quantidade de workers.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+
+        # Views sem escopo não possuem limite de acessos.
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        allowed, self.wait_time = throttle_store.hit(
+            key, self.scope, self.num_requests, self.duration, time.time()
+        )
+
+        if not allowed:
+            logger.warning("Limite de acessos excedido (%s): %s.", self.scope, key)
+
+        return allowed
+
+    def wait(self):
+        return self.wait_time
@@ -1,13 +1,75 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import HttpResponse, HttpResponseNotModified, Http404
+from django.utils.http import parse_etags
+from django.core.exceptions import ImproperlyConfigured
+from asgiref.sync import sync_to_async
 from typing import Callable
+import inspect
 
 from apps.user.models import User
 
+from .snapshot import SCSnapshot
+
+
+class AccessPolicy:
+    """Política de acesso a um método de uma view (ver `SCView.access`)."""
+
+    def __init__(
+        self,
+        name: str,
+        requires_authentication: bool,
+        check: Callable[[User], bool] = lambda user: True,
+    ):
+        self.name = name
+        self.requires_authentication = requires_authentication
+        self.check = check
+
+    def __repr__(self):
+        return self.name
+
+
+# Acesso sem autenticação (o token não é verificado).
+PUBLIC = AccessPolicy("PUBLIC", requires_authentication=False)
+# Acesso para qualquer usuário autenticado.
+AUTHENTICATED = AccessPolicy("AUTHENTICATED", requires_authentication=True)
+# Acesso apenas para funcionários.
+EMPLOYEE = AccessPolicy(
+    "EMPLOYEE", requires_authentication=True, check=lambda user: user.is_employee
+)
+
 
 class SCView(APIView):
-    ignore_validation_for_methods: list[str] = []
+    """View base do sistema Cactus.
+
+    A política de acesso de cada método é declarada em `access` (ex.:
+    `access = {"get": PUBLIC, "post": EMPLOYEE}`) e aplicada pelo `SCAuthenticationHttp`.
+    Os métodos não declarados utilizam `default_access`. As políticas são compiladas
+    uma única vez, na criação da classe, em `access_policies`.
+    """
+
+    access: dict[str, AccessPolicy] = {}
+    default_access: AccessPolicy = AUTHENTICATED
+    access_policies: dict[str, AccessPolicy] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        unknown = set(cls.access) - set(cls.http_method_names)
+        if unknown:
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.access possui métodos inválidos: {', '.join(sorted(unknown))}."
+            )
+
+        cls.access_policies = {
+            method.upper(): cls.access.get(method, cls.default_access)
+            for method in cls.http_method_names
+        }
+
+        # O método HEAD utiliza a política do GET, assim como a sua implementação.
+        if "head" not in cls.access and "get" in cls.access:
+            cls.access_policies["HEAD"] = cls.access["get"]
 
     def http_method_not_allowed(self, request, *args, **kwargs):
         method = request.method.upper()
@@ -16,31 +78,97 @@ class SCView(APIView):
             status=status.HTTP_405_METHOD_NOT_ALLOWED,
         )
 
-    def validate_before_access(self, user: User, method: str) -> bool:
-        """Valida se um usuário tem permissão para acessar um método específico antes da execução.
+    def get_access_policy(self, method: str) -> AccessPolicy:
+        """Retorna a política de acesso de um método HTTP (ex.: 'GET')."""
 
-        Esta função verifica se existe uma validação específico para o método solicitado
-        e o executa, retornando True se a validação passar ou False caso contrário. Métodos
-        listados em `ignore_validation_for_methods` são ignorados na validação.
+        return self.access_policies.get(method, self.default_access)
 
-        Nota: Ao sobreescrever essa função, a validação será aplicada a todos os métodos.
+    def snapshot_response(
+        self, snapshot: SCSnapshot, part: str | None = None
+    ) -> HttpResponse:
+        """Retorna uma parte de um snapshot já renderizada em JSON, sem serialização adicional.
 
-        Args:
-            user (User): O objeto do usuário que está tentando acessar o método.
-            method (str): O nome do método a ser validado (ex.: 'post', 'update').
+        A resposta possui um ETag forte derivado da versão do snapshot. Caso o cliente
+        informe a versão atual em `If-None-Match`, retorna `304 Not Modified` sem o
+        conteúdo. A versão é comparada antes de qualquer reconstrução ou renderização;
+        apenas a existência de uma parte nomeada é verificada antes do 304, de modo que
+        uma parte inexistente retorna 404 mesmo com o ETag atual.
 
-        Returns:
-            bool: True se o acesso é permitido, False se o acesso é negado ou a validação falhar.
+        Raises:
+            Http404: Se a parte solicitada não existir no snapshot.
         """
 
-        validator_method_name = f"validate_{method}_before_access"
+        version = snapshot.sync()
 
-        if hasattr(self, validator_method_name):
-            validator_method: Callable[[User, str], bool] = getattr(
-                self, validator_method_name
-            )
+        if self.etag_matches(version):
+            if part is not None:
+                try:
+                    version = snapshot.check(part)
+                except KeyError:
+                    raise Http404
+
+            if self.etag_matches(version):
+                response = HttpResponseNotModified()
+                response["ETag"] = self.make_etag(version)
+                return response
+
+        # A parte é renderizada uma única vez por versão (ver `SCSnapshot.get_rendered`).
+        try:
+            version, content = snapshot.get_rendered(part)
+        except KeyError:
+            raise Http404
+
+        response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = self.make_etag(version)
+        return response
+
+    def etag_matches(self, version: int) -> bool:
+        """Verifica se o cabeçalho `If-None-Match` da requisição contém a versão informada."""
+
+        header = self.request.headers.get("If-None-Match")
+        if not header:
+            return False
+
+        # A comparação fraca é utilizada, conforme a RFC 9110 para `If-None-Match`.
+        etags = [etag.removeprefix("W/") for etag in parse_etags(header)]
+        return "*" in etags or self.make_etag(version) in etags
+
+    @staticmethod
+    def make_etag(version: int) -> str:
+        return f'"{version}"'
+
+
+class SCAsyncView(SCView):
+    """View com métodos assíncronos (ex.: `async def post(self, request)`).
+
+    O Django REST framework executa apenas views síncronas. A preparação da requisição
+    (autenticação, permissões e limites de acesso) é executada em uma thread, enquanto os
+    métodos são aguardados no loop de eventos, sem ocupar uma thread em operações longas.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            # Métodos herdados do `APIView` (ex.: options) são síncronos.
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
 
-            if callable(validator_method) and not validator_method(user, method):
-                return False
+        except Exception as exc:
+            response = self.handle_exception(exc)
 
-        return True
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
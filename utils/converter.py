@@ -1,7 +1,8 @@
 from core.variables import days_week
 
+# Mapeamento inverso (nome -> número) para a conversão em tempo constante.
+days_number = {day: key for key, day in days_week.items()}
+
 
 def day_to_number_converter(value: str):
-    for key, day in days_week.items():
-        if day == value:
-            return key
+    return days_number.get(value)
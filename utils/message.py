@@ -1,11 +1,158 @@
+from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.conf import settings
+from typing import Any, Callable
+import contextvars
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-def dispatch_message_websocket(group_name: str, type_message: str, message=""):
+
+class MessageDispatcher:
+    """Despachante de mensagens websocket com agrupamento (coalescência) por grupo.
+
+    As mensagens de um mesmo grupo e tipo enviadas dentro da janela configurada em
+    `WEBSOCKET_DISPATCH_WINDOW` (segundos) são agrupadas e apenas a última é enviada.
+    O envio ocorre no loop de eventos principal do servidor ASGI (registrado por
+    `bind_event_loop`), fora da thread da requisição. Sem um loop de eventos disponível
+    (ex.: comandos de gerenciamento), a mensagem é enviada imediatamente.
+
+    A mensagem pode ser uma função, executada apenas no momento do envio, permitindo que
+    o conteúdo seja gerado uma única vez a partir do estado mais recente. Caso a função
+    retorne None, o envio é descartado. Falhas na geração ou no envio são registradas no
+    log e contabilizadas em `failed`.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.suppressed = 0
+        self.failed = 0
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._pending: dict[tuple[str, str], Any] = {}
+        # O loop de eventos mantém apenas referências fracas às tarefas.
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def window(self) -> float:
+        return getattr(settings, "WEBSOCKET_DISPATCH_WINDOW", 0.15)
+
+    def get_stats(self) -> dict:
+        """Retorna os contadores de mensagens enviadas, suprimidas pelo agrupamento e com falha."""
+
+        return {
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "failed": self.failed,
+            "pending": len(self._pending),
+        }
+
+    def dispatch(
+        self, group_name: str, type_message: str, message: Any | Callable[[], Any] = ""
+    ):
+        """Agenda o envio de uma mensagem para um grupo de clientes websocket."""
+
+        loop = self._get_main_event_loop()
+
+        if loop is None:
+            if callable(message):
+                message = message()
+
+            if message is not None:
+                self._send(group_name, type_message, message)
+
+            return
+
+        # O envio é executado em um contexto vazio, desvinculado da thread da requisição:
+        # caso contrário, a geração da mensagem aguardaria a própria requisição terminar.
+        loop.call_soon_threadsafe(
+            self._enqueue,
+            loop,
+            group_name,
+            type_message,
+            message,
+            context=contextvars.Context(),
+        )
+
+    def _enqueue(self, loop, group_name, type_message, message):
+        key = (group_name, type_message)
+
+        if key in self._pending:
+            # Uma mensagem do grupo já aguarda o envio: apenas a mais recente é mantida.
+            self._pending[key] = message
+            self.suppressed += 1
+            return
+
+        self._pending[key] = message
+        loop.call_later(self.window, self._start_flush, loop, key)
+
+    def _start_flush(self, loop, key):
+        task = loop.create_task(self._flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: tuple[str, str]):
+        group_name, type_message = key
+        message = self._pending.pop(key)
+
+        try:
+            if callable(message):
+                message = await database_sync_to_async(message)()
+
+            if message is not None:
+                await get_channel_layer().group_send(
+                    group_name, {"type": type_message, "message": message}
+                )
+                self.sent += 1
+
+        except Exception:
+            # A tarefa não é aguardada: sem o registro, a falha seria descartada silenciosamente.
+            self.failed += 1
+            logger.exception(
+                "Falha no envio da mensagem websocket (%s, %s).",
+                group_name,
+                type_message,
+            )
+
+    def _send(self, group_name, type_message, message):
+        async_to_sync(get_channel_layer().group_send)(
+            group_name, {"type": type_message, "message": message}
+        )
+        self.sent += 1
+
+    def _get_main_event_loop(self) -> asyncio.AbstractEventLoop | None:
+        """Obtém o loop de eventos em execução ou o loop principal do servidor ASGI."""
+
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+        loop = self.loop
+        return loop if loop is not None and loop.is_running() else None
+
+
+dispatcher = MessageDispatcher()
+
+
+def dispatch_message_websocket(
+    group_name: str, type_message: str, message: Any | Callable[[], Any] = ""
+):
     """Dispara uma mensagem para um grupo de clientes websocket do sistema Cactus."""
 
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        group_name, {"type": type_message, "message": message}
-    )
+    dispatcher.dispatch(group_name, type_message, message)
+
+
+def bind_event_loop(application):
+    """Envolve a aplicação ASGI, registrando o loop de eventos do servidor no despachante.
+
+    As views síncronas são executadas em outras threads, sem acesso ao loop de eventos
+    do servidor, no qual as mensagens websocket são agrupadas e enviadas.
+    """
+
+    async def app(scope, receive, send):
+        dispatcher.loop = asyncio.get_running_loop()
+        return await application(scope, receive, send)
+
+    return app